@@ -0,0 +1,42 @@
+# # Benchmark of GP hyperparameter fitting
+# Wall time of GPRegression.fit_hyperparameters() as the number of training samples grows,
+# with and without random restarts on a process pool.
+
+import sys
+sys.path.append('..')
+
+import time
+import numpy as np
+
+from pyArena.algorithms import gaussian_process as GP
+
+## Simulated 2D scalar field
+func = lambda x: 10*np.sin(0.2*x[0]) + 5*np.cos(0.3*x[1])
+noise_std = 0.5
+
+sample_counts = [100, 200, 400, 800, 1600]
+restarts = 3
+processes = 4
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+
+    print('{:>8} {:>12} {:>16} {:>8} {:>8} {:>8}'.format('samples', 'fit [s]', 'restarts [s]', 'sigma', 'length', 'noise'))
+    for numTrain in sample_counts:
+        xTrain = rng.uniform(-25, 25, [2, numTrain])
+        yTrain = func(xTrain) + noise_std*rng.standard_normal(numTrain)
+
+        mGP = GP.GPRegression(measurementNoiseCov=0.1)
+        mGP.trainGP(xTrain, yTrain)
+        start = time.perf_counter()
+        mGP.fit_hyperparameters()
+        single_time = time.perf_counter() - start
+
+        mGP_restarts = GP.GPRegression(measurementNoiseCov=0.1)
+        mGP_restarts.trainGP(xTrain, yTrain)
+        start = time.perf_counter()
+        mGP_restarts.fit_hyperparameters(restarts=restarts, processes=processes, seed=0)
+        restarts_time = time.perf_counter() - start
+
+        print('{:>8} {:>12.3f} {:>16.3f} {:>8.2f} {:>8.2f} {:>8.3f}'.format(numTrain, single_time, restarts_time,
+              mGP_restarts.kernel.sigma, mGP_restarts.kernel.length, mGP_restarts.noiseCov))
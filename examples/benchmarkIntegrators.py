@@ -0,0 +1,32 @@
+# # Benchmark of the integrators of DynamicSystem
+# Per-step cost of DynamicSystem.integrate() for a unicycle with each integrator,
+# and the final position error with respect to the closed-form solution.
+
+import sys
+sys.path.append('..')
+
+import time
+import numpy as np
+
+from pyArena.vehicles.unicycle import Unicycle
+
+dt = .01
+numSteps = 2000
+x_init = np.array([0.0, 0.0, np.pi/2])
+u = np.array([1.0, 0.3])
+
+results = dict()
+for integrator in ['ode45', 'euler', 'rk4', 'exact']:
+    kwargsSystem = {'initialCondition': x_init, 'dt': dt, 'real_time': False, 'integrator': integrator, 'transport': None}
+    vehicle = Unicycle(**kwargsSystem)
+
+    x = x_init.copy()
+    start = time.perf_counter()
+    for k in range(0, numSteps):
+        x = vehicle.integrate(k*dt, x, u)
+    results[integrator] = ((time.perf_counter() - start)/numSteps, x)
+
+print('{:>8} {:>14} {:>10} {:>14}'.format('method', 'step [us]', 'speedup', 'final error'))
+for integrator, (step_time, x) in results.items():
+    error = np.linalg.norm(x[0:2] - results['exact'][1][0:2])
+    print('{:>8} {:>14.2f} {:>10.1f} {:>14.2e}'.format(integrator, 1e6*step_time, results['ode45'][0]/step_time, error))
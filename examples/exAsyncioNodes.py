@@ -0,0 +1,52 @@
+# # Trajectory tracking control for unicyle robot on a single asyncio event loop
+# The vehicle and the controller run as coroutines of one AsyncioTransport in real time: no ROS master
+# and no callback threads.
+
+## Necessary imports
+import sys
+sys.path.append('..')
+
+import pyArena.control.trajectorytracking as pyacontrol
+from pyArena.vehicles.unicycle import Unicycle
+from pyArena.core.transport import AsyncioTransport
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+simTime = 30
+transport = AsyncioTransport()
+
+# Vehicle parameters
+x_init = np.array([10.0, 0.0, np.pi/2])
+kwargsSystem = {'initialCondition': x_init, 'dt': .01, 'real_time': True, 'integrator': 'exact', 'transport': transport}
+vehicle = Unicycle(**kwargsSystem)
+
+## Trajectory tracking parameters
+K = np.array([[1, 0.0],[0.0, 0.1]])
+eps = np.array([1, 0])
+radius = 30   # trajectory's radius
+w = 0.05
+pd = lambda t: radius*np.array([np.cos(w*t), np.sin(w*t)])
+pdDot = lambda t: radius*np.array([-w*np.sin(w*t), w*np.cos(w*t)])
+
+## Specify the controller
+kwargsController = {'pd': pd, 'pdDot': pdDot, 'gain': K, 'eps': eps, 'dt': .05, 'real_time': True,
+                    'plot': False, 'transport': transport}
+ttController = pyacontrol.TrajectoryTracking2D(**kwargsController)
+
+## Record the state published by the vehicle
+trajectory = []
+transport.subscribe('state', lambda data: trajectory.append(np.array(data)))
+
+## Run every node on the event loop for simTime seconds
+vehicle.run()
+ttController.run()
+transport.timer(simTime, lambda now: transport.shutdown())
+transport.spin()
+
+trajectory = np.array(trajectory)
+pd_t = np.array([pd(t) for t in trajectory[:,0]])
+plt.plot(trajectory[:,1], trajectory[:,2])
+plt.plot(pd_t[:,0], pd_t[:,1], '--')
+plt.axis('equal')
+plt.show()
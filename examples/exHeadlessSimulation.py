@@ -0,0 +1,46 @@
+# # Headless trajectory tracking simulation for unicyle robot
+# Runs the closed loop in-process with the Simulation runner: no ROS master needed.
+
+## Necessary imports
+import sys
+sys.path.append('..')
+
+from pyArena.vehicles.unicycle import Unicycle
+from pyArena.control.trajectorytracking import TrajectoryTracking2D
+from pyArena.core.simulation import Simulation
+
+import time
+import numpy as np
+import matplotlib.pyplot as plt
+
+# Vehicle parameters
+x_init = np.array([10.0, 0.0, np.pi/2])
+kwargsSystem = {'initialCondition': x_init, 'dt': .01, 'real_time': False, 'integrator': 'exact', 'transport': None}
+vehicle = Unicycle(**kwargsSystem)
+
+## Trajectory tracking parameters
+K = np.array([[1, 0.0],[0.0, 0.1]])
+eps = np.array([1, 0])
+radius = 30   # trajectory's radius
+w = 0.05
+pd = lambda t: radius*np.array([np.cos(w*t), np.sin(w*t)])
+pdDot = lambda t: radius*np.array([-w*np.sin(w*t), w*np.cos(w*t)])
+
+## Specify the controller
+kwargsController = {'pd': pd, 'pdDot': pdDot, 'gain': K, 'eps': eps, 'dt': .05, 'real_time': False,
+                    'plot': False, 'transport': None}
+ttController = TrajectoryTracking2D(**kwargsController)
+
+## Simulate
+start = time.perf_counter()
+dataLog = Simulation(system=vehicle, controller=ttController, simTime=200).run()
+print('Simulated {} s in {:.3f} s'.format(dataLog.time[-1], time.perf_counter() - start))
+
+## Plot results
+pdVec = pd(dataLog.time).T
+plt.plot(pdVec[:,0], pdVec[:,1], 'k--', label='Desired trajectory')
+plt.plot(dataLog.stateTrajectory[:,0], dataLog.stateTrajectory[:,1], 'b', label='Real trajectory')
+plt.axis('equal')
+plt.legend()
+plt.grid()
+plt.show()
@@ -0,0 +1,47 @@
+# # Lawnmower survey with waypoint guidance in lock step
+# The vehicle (100 Hz), the guidance controller (20 Hz) and the lawnmower planner (1 Hz) run their own
+# transport timers on the simulated clock of a LockStepTransport: deterministic and as fast as possible.
+
+## Necessary imports
+import sys
+sys.path.append('..')
+
+from pyArena.vehicles.unicycle import Unicycle
+from pyArena.control.guidance2D import LOSUnicycle
+from pyArena.planning.lawnmower import Lawnmower2D
+from pyArena.core.transport import LockStepTransport
+
+import time
+import numpy as np
+import matplotlib.pyplot as plt
+
+transport = LockStepTransport()
+
+# Vehicle parameters
+x_init = np.array([0.0, 0.0, 0.0])
+kwargsSystem = {'initialCondition': x_init, 'dt': .01, 'real_time': False, 'integrator': 'exact', 'transport': transport}
+vehicle = Unicycle(**kwargsSystem)
+
+## Guidance and planning
+guidance = LOSUnicycle(dt=.05, real_time=False, plot=False, transport=transport)
+planner = Lawnmower2D(dt=1., transport=transport)
+planner.compute_plan([0, 0], [20, 10], 5)
+
+## Record the state published by the vehicle
+trajectory = []
+transport.subscribe('state', lambda data: trajectory.append(np.array(data)))
+
+## Components at the same tick run in the order of their run() calls
+vehicle.run()
+planner.run()
+guidance.run()
+
+start = time.time()
+transport.run(100)
+print("Simulated {:.0f} s in {:.2f} s".format(transport.now(), time.time() - start))
+
+trajectory = np.array(trajectory)
+plt.plot(trajectory[:,1], trajectory[:,2])
+plt.plot(planner.wp_plan[0], planner.wp_plan[1], 'o')
+plt.axis('equal')
+plt.show()
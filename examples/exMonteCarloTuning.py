@@ -0,0 +1,49 @@
+# # Monte-Carlo tuning of the trajectory tracking controller
+# Sweeps the gain and eps of TrajectoryTracking2D over random initial conditions on a process pool
+# and reports the tracking error of each combination.
+
+## Necessary imports
+import sys
+sys.path.append('..')
+
+from pyArena.vehicles.unicycle import Unicycle
+from pyArena.control.trajectorytracking import TrajectoryTracking2D
+from pyArena.core.experiment import ExperimentRunner
+
+import numpy as np
+
+## Desired trajectory
+radius = 30   # trajectory's radius
+w = 0.05
+
+def pd(t):
+    return radius*np.array([np.cos(w*t), np.sin(w*t)])
+
+def pdDot(t):
+    return radius*np.array([-w*np.sin(w*t), w*np.cos(w*t)])
+
+## Closed loop of a single experiment (runs in the worker processes)
+def setup(params, seed):
+    x_init = np.array([radius, 0., np.pi/2]) + np.array([5., 5., np.pi])*np.random.randn(3)
+    kwargsSystem = {'initialCondition': x_init, 'dt': .01, 'real_time': False, 'integrator': 'exact', 'transport': None}
+    vehicle = Unicycle(**kwargsSystem)
+
+    kwargsController = {'pd': pd, 'pdDot': pdDot, 'gain': np.diag([params['k_lin'], params['k_ang']]),
+                        'eps': np.array([params['eps'], 0.]), 'dt': .05, 'real_time': False,
+                        'plot': False, 'transport': None}
+    controller = TrajectoryTracking2D(**kwargsController)
+
+    return {'system': vehicle, 'controller': controller}
+
+if __name__ == "__main__":
+    parameters = {'k_lin': [.5, 1., 2.], 'k_ang': [.05, .1, .5], 'eps': [.5, 1.]}
+    runner = ExperimentRunner(setup=setup, parameters=parameters, seeds=10, simTime=60)
+    results = runner.run()
+
+    # Average over seeds for each parameter combination
+    print('{:>6} {:>6} {:>6} {:>10} {:>10}'.format('k_lin', 'k_ang', 'eps', 'rms', 'final'))
+    combinations = np.unique(np.stack([results['k_lin'], results['k_ang'], results['eps']], axis=1), axis=0)
+    for k_lin, k_ang, eps in combinations:
+        rows = (results['k_lin'] == k_lin) & (results['k_ang'] == k_ang) & (results['eps'] == eps)
+        print('{:>6} {:>6} {:>6} {:>10.3f} {:>10.3f}'.format(k_lin, k_ang, eps,
+              np.mean(results['rms_error'][rows]), np.mean(results['final_error'][rows])))
@@ -0,0 +1,57 @@
+# # Trajectory tracking control for unicyle robot over shared memory
+# The vehicle and the controller run as two processes on the same host and exchange the state and
+# input streams through SharedMemoryTransport ring buffers: no ROS master needed.
+
+## Necessary imports
+import sys
+sys.path.append('..')
+
+import pyArena.control.trajectorytracking as pyacontrol
+from pyArena.vehicles.unicycle import Unicycle
+from pyArena.core.transport import SharedMemoryTransport
+
+import numpy as np
+import multiprocessing as mp
+
+simTime = 60
+
+def vehicle_node():
+    transport = SharedMemoryTransport(namespace='exShm')
+
+    # Vehicle parameters
+    x_init = np.array([10.0, 0.0, np.pi/2])
+    kwargsSystem = {'initialCondition': x_init, 'dt': .01, 'real_time': True, 'integrator': 'exact', 'transport': transport}
+    vehicle = Unicycle(**kwargsSystem)
+
+    vehicle.run()
+    transport.timer(simTime, lambda now: transport.shutdown())
+    transport.spin()
+    print("[Vehicle] t = {:.2f} s, x = {}".format(vehicle.t, vehicle.x))
+
+def controller_node():
+    transport = SharedMemoryTransport(namespace='exShm')
+
+    ## Trajectory tracking parameters
+    K = np.array([[1, 0.0],[0.0, 0.1]])
+    eps = np.array([1, 0])
+    radius = 30   # trajectory's radius
+    w = 0.05
+    pd = lambda t: radius*np.array([np.cos(w*t), np.sin(w*t)])
+    pdDot = lambda t: radius*np.array([-w*np.sin(w*t), w*np.cos(w*t)])
+
+    ## Specify the controller
+    kwargsController = {'pd': pd, 'pdDot': pdDot, 'gain': K, 'eps': eps, 'dt': .05, 'real_time': True,
+                        'plot': False, 'transport': transport}
+    ttController = pyacontrol.TrajectoryTracking2D(**kwargsController)
+
+    ttController.run()
+    transport.timer(simTime, lambda now: transport.shutdown())
+    transport.spin()
+    print("[Controller] tracking error = {:.3f}".format(ttController.tracking_error(ttController.t, ttController.x)))
+
+if __name__ == "__main__":
+    nodes = [mp.Process(target=node) for node in [vehicle_node, controller_node]]
+    for node in nodes:
+        node.start()
+    for node in nodes:
+        node.join()
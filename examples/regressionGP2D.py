@@ -3,6 +3,7 @@ sys.path.append('..')
 
 import pyArena.core as pyacore
 from pyArena.algorithms import gaussian_process as GP
+from pyArena.algorithms import kernels as GPkernels
 import numpy as np
 import matplotlib.pyplot as plt
 
@@ -17,7 +18,7 @@ sensorEnv = pyacore.sensors.StaticScalarField2D(**kwargsSensor)
 # Specify GP Model
 phi = 0.2
 tau_s = 5
-kernel = lambda x1, x2: np.exp(-(0.5/np.float_power(tau_s,2))*np.float_power(np.linalg.norm(x1-x2), 2))
+kernel = GPkernels.SquaredExponential(sigma=1., length=tau_s)
 
 kwargsGP = {'kernel': kernel, 'measurementNoiseCov': phi}
 
@@ -11,15 +11,18 @@ sys.path.append('..')
 ## Necessary imports
 import pyArena.core as pyacore
 import pyArena.control.trajectorytracking as pyacontrol
-import pyArena.vehicles.underactuatedvehicle as pyavehicle
+from pyArena.vehicles.unicycle import Unicycle
+from pyArena.core.map import StaticMap
+from pyArena.core.simulation import Simulation
+from pyArena.core.logger import DataLogger
+from pyArena.algorithms.gaussian_process import GPRegression
+from pyArena.algorithms import kernels as GPkernels
 
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib import cm
 
 ## Simulation parameters
-nx = 3
-nu = 2
 Tsim = 15
 dt = .1
 x_init = np.array([0.0, 0.0, np.pi/2])
@@ -32,9 +35,24 @@ sensorEnv = pyacore.sensors.StaticScalarField2D(**kwargsSensor)
 ## GP parameters
 phi = 0.2
 tau_s = 5
-kernel = lambda x1, x2: np.exp(-(0.5/np.float_power(tau_s,2))*np.float_power(np.linalg.norm(x1-x2), 2))
+kernel = GPkernels.SquaredExponential(sigma=1., length=tau_s)
 kwargsGP = {'kernel': kernel, 'measurementNoiseCov': phi}
 
+## Map trained online with every measurement
+class OnlineGP(StaticMap):
+    def __init__(self, **kwargs):
+        self.m_gp = GPRegression(**kwargs['GaussianProcess'])
+        kwargs.update({'x_dimension': 2})
+        super().__init__(**kwargs)
+
+    def compute_map(self, t, x, measurement):
+        self.m_gp.trainGPIterative(x, measurement, t)
+
+    def get_map(self):
+        pass
+
+gpMap = OnlineGP(GaussianProcess=kwargsGP, width=10, height=10, transport=None)
+
 ## Specify desired trajectory
 radius = 4
 a = 2*np.pi/10
@@ -46,16 +64,18 @@ K = np.array([[1, 0.0],[0.0, 0.1]])
 eps = np.array([1, 0])
 
 ## Specify the controller
-kwargsController = {'pd': pd, 'pdDot': pdDot, 'gain': K, 'eps': eps, 'GaussianProcess': kwargsGP}
-ttController = pyacontrol.TrajectoryTrackingWithGP(**kwargsController)
+kwargsController = {'pd': pd, 'pdDot': pdDot, 'gain': K, 'eps': eps, 'dt': dt, 'real_time': False,
+                    'plot': False, 'transport': None}
+ttController = pyacontrol.TrajectoryTracking2D(**kwargsController)
 
 ## Assembling system
-kwargsSystem = {'initialCondition': x_init, 'controller': ttController, 'sensor': sensorEnv}
-system = pyavehicle.UnicycleKinematics(**kwargsSystem)
+kwargsSystem = {'initialCondition': x_init, 'dt': dt, 'real_time': False, 'integrator': 'exact', 'transport': None}
+system = Unicycle(**kwargsSystem)
 
 ## Create pyArena simulation object
-kwargsSimulation = {'system': system, 'simTime': Tsim, 'dt': dt}
-pyA = pyacore.simulator.pyArena(**kwargsSimulation)
+kwargsSimulation = {'system': system, 'simTime': Tsim, 'controller': ttController, 'sensor': sensorEnv,
+                    'map': gpMap, 'logger': DataLogger()}
+pyA = Simulation(**kwargsSimulation)
 
 # Plotting sensorEnv ground truth
 numTruth = 100
@@ -69,7 +89,7 @@ ax = plt.subplot(1,1,1)
 p = ax.pcolor(X0, X1, Y, cmap=cm.jet, vmin=-20, vmax=20)
 cb = h.colorbar(p)
 plt.axis('equal')
-plt.show(0)
+plt.show(block=False)
 
 # Run simulation
 dataLog = pyA.run()
@@ -81,4 +101,10 @@ pdVec = pd(dataLog.time).T
 plt.plot(pdVec[:,0], pdVec[:,1], 'k--')
 plt.plot(dataLog.stateTrajectory[:,0], dataLog.stateTrajectory[:,1], 'r')
 plt.axis('equal')
+
+h = plt.figure("GP estimate")
+ax = plt.subplot(1,1,1)
+p = ax.pcolor(X0, X1, gpMap.m_gp.predict(xTruth, return_var=False).reshape(numTruth,numTruth), cmap=cm.jet, vmin=-20, vmax=20)
+cb = h.colorbar(p)
+plt.axis('equal')
 plt.show()
@@ -1 +1 @@
-all = ["gaussian_process"]
+all = ["gaussian_process", "kernels", "local_gp"]
@@ -1,5 +1,11 @@
 import numpy as np
 from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
+from scipy.linalg import cho_solve, solve_triangular
+from scipy.optimize import minimize
+
+from .kernels import SquaredExponential
 
 import matplotlib.pyplot as plt
 from matplotlib import cm
@@ -16,103 +22,376 @@ class GPRegression(GaussianProcess):
         super().__init__(**kwargs)
 
         self.noiseCov =  kwargs['measurementNoiseCov'] if 'measurementNoiseCov' in kwargs else 0.0
-        self.sigma    =  kwargs['sigma'] if 'sigma' in kwargs else 1.0
-        self.length   =  kwargs['length'] if 'length' in kwargs else 2
+        # Covariance function (see pyArena.algorithms.kernels), squared exponential by default
+        if 'kernel' in kwargs:
+            self.kernel = kwargs['kernel']
+        else:
+            self.kernel = SquaredExponential(sigma=kwargs['sigma'] if 'sigma' in kwargs else 1.0,
+                                             length=kwargs['length'] if 'length' in kwargs else 2)
+        # Small diagonal term that keeps the Cholesky factor well defined for repeated inputs
+        self.jitter   =  kwargs['jitter'] if 'jitter' in kwargs else 1e-6
+        # Upper bound on kernel entries evaluated at once by update_grid (~32 MB of float64)
+        self.gridChunkElements = kwargs['gridChunkElements'] if 'gridChunkElements' in kwargs else 2**22
      
         self.inpTrain = None
         self.outTrain = None        
+        self.timeTrain = None
         self.numTrain = 0
+        self.grid_layers = None
+
+        # Bounded memory for time-varying fields: at most windowSize samples (None for unbounded) and
+        # samples older than maxAge [s] are forgotten. When the window is full, pruning selects the sample
+        # to remove: 'oldest', or 'information' (exact method only) for the one best explained by the others
+        self.windowSize = kwargs['windowSize'] if 'windowSize' in kwargs else None
+        self.maxAge = kwargs['maxAge'] if 'maxAge' in kwargs else None
+        self.pruning = kwargs['pruning'] if 'pruning' in kwargs else 'oldest'
+
+        # Lower triangular Cholesky factor of (Ktrtr + noise*I), stored in a buffer that grows by doubling
+        self._chol_buffer = np.zeros([0,0])
+        # Cached weights (Ktrtr + noise*I)^-1 outTrain, reset whenever the training set changes
+        self._alpha = None
+
+        # Approximation used for training and prediction: 'exact', or the inducing point methods 'sor'
+        # (subset of regressors) and 'fitc' (fully independent training conditional)
+        self.method = kwargs['method'] if 'method' in kwargs else 'exact'
+        if self.method not in ['exact', 'sor', 'fitc']:
+            raise KeyError("[GP] Unknown method '{}', use 'exact', 'sor' or 'fitc'".format(self.method))
+        if self.method != 'exact':
+            if 'inducingPoints' not in kwargs:
+                raise KeyError("[GP] Must specify inducingPoints (numDim, numInducing) for sparse methods")
+            self.inducingPoints = np.asarray(kwargs['inducingPoints'], dtype=float)
+            self._init_sparse()
+        if self.pruning not in ['oldest', 'information'] or (self.pruning == 'information' and self.method != 'exact'):
+            raise KeyError("[GP] Unknown pruning '{}' for method '{}'".format(self.pruning, self.method))
+
+    """
+    Sparse GP statistics. With Z the inducing points, Kmm = K(Z,Z) and kz_i = K(Z,x_i),
+    A = Kmm + sum_i kz_i kz_i^T / lambda_i  and  b = sum_i kz_i y_i / lambda_i,
+    where lambda_i = noise (SoR) or noise + k(x_i,x_i) - kz_i^T Kmm^-1 kz_i (FITC).
+    Both are sums over samples, so training costs O(numInducing^2) per sample.
+    """
+    def _init_sparse(self):
+        numInducing = self.inducingPoints.shape[1]
+        Kmm = self.kernel(self.inducingPoints, self.inducingPoints)
+        Kmm[np.diag_indices_from(Kmm)] += self.jitter
+
+        self._Lmm = np.linalg.cholesky(Kmm)
+        self._sparse_A = Kmm
+        self._sparse_b = np.zeros(numInducing)
+        self._sparse_lambda = np.zeros(0)
+        self._sparse_factor = None
+
+    def _sparse_statistics(self, inpTrain):
+        Kmn = self.kernel(self.inducingPoints, inpTrain)
+        lam = self.noiseCov*np.ones(inpTrain.shape[1])
+        if self.method == 'fitc':
+            V = solve_triangular(self._Lmm, Kmn, lower=True, check_finite=False)
+            lam += self.kernel.diag(inpTrain) - np.einsum('ij,ij->j', V, V)
+        return Kmn, np.maximum(lam, self.jitter)
+
+    def _train_sparse(self, inpTrain, outTrain, timeTrain):
+        Kmn, lam = self._sparse_statistics(inpTrain)
+        self._sparse_A += (Kmn/lam) @ Kmn.T
+        self._sparse_b += Kmn @ (outTrain/lam)
+        self._sparse_lambda = np.hstack([self._sparse_lambda, lam])
+        self._sparse_factor = None
+        self._alpha = None
+
+        if self.numTrain == 0:
+            self.inpTrain = inpTrain.copy()
+            self.outTrain = outTrain.copy()
+            self.timeTrain = timeTrain.copy()
+        else:
+            self.inpTrain = np.hstack([self.inpTrain, inpTrain])
+            self.outTrain = np.hstack([self.outTrain, outTrain])
+            self.timeTrain = np.hstack([self.timeTrain, timeTrain])
+        self.numTrain += inpTrain.shape[1]
+
+    """
+    Cholesky factor of the (numInducing, numInducing) sparse system matrix A
+    """
+    @property
+    def sparseFactor(self):
+        if self._sparse_factor is None:
+            self._sparse_factor = np.linalg.cholesky(self._sparse_A)
+        return self._sparse_factor
+
+    """
+    Cholesky factor L of (Ktrtr + noise*I) for the current training set (exact method)
+    """
+    @property
+    def cholFactor(self):
+        return self._chol_buffer[:self.numTrain, :self.numTrain]
 
-    def kernel(self, distance):
-        return (self.sigma**2) * np.exp(-.5*(distance/self.length)**2)
-    
     """
     trainModel(inpTrain, outTrain)
     The function is used to train the GP model given input (inpTrain) and  output (outTrain) training data.
     Training the GP model implies computation of prior mean and convariance distribution over the regressor function.
+    New samples are appended to the current training set. A batch given to an untrained model is factorized
+    at once, otherwise each sample goes through trainGPIterative. Sparse methods take the whole batch
+    in O(numTrain*numInducing^2).
 
     Necessary function arguments:
-    inpTrain - (numDim, numTrain) numpy array
+    inpTrain - (numDim, numTrain) numpy array or (numDim,) for a single sample
     outTrain - (numTrain, 1) numpy array. Actually a 1D numpy array
+    Optional:
+    t - time stamp of the samples, scalar or (numTrain,) numpy array (required by maxAge)
     """
-    def trainGP(self, inpTrain, outTrain):
-        # Compute the prior GP covariance matrix
-        inpTrain = inpTrain.reshape([2,1])
-        if self.inpTrain is None:
-            self.inpTrain = inpTrain.copy()
-            self.outTrain = np.array([outTrain])
-        else:
-            self.inpTrain = np.hstack([self.inpTrain, inpTrain])
-            self.outTrain = np.hstack([self.outTrain, outTrain])
-        
-        self.numTrain += 1 
+    def trainGP(self, inpTrain, outTrain, t=None):
+        inpTrain = np.asarray(inpTrain, dtype=float)
+        if inpTrain.ndim == 1:
+            inpTrain = inpTrain.reshape([-1,1])
+        outTrain = np.asarray(outTrain, dtype=float).reshape(-1)
+        timeTrain = np.broadcast_to(np.nan if t is None else np.asarray(t, dtype=float), outTrain.shape).copy()
 
-        Ktrtr = np.zeros([self.numTrain,self.numTrain])
+        if self.method != 'exact':
+            self._train_sparse(inpTrain, outTrain, timeTrain)
+        elif self.numTrain == 0 and inpTrain.shape[1] > 1:
+            Ktrtr = self.kernel(inpTrain, inpTrain)
+            Ktrtr[np.diag_indices_from(Ktrtr)] += self.noiseCov + self.jitter
 
-        for row in range(0,self.numTrain):
-            for column in range(row, self.numTrain):
-                distance = np.linalg.norm(self.inpTrain[:,row] - self.inpTrain[:,column])
-                Ktrtr[column, row] = Ktrtr[row, column] = self.kernel(distance)
+            self.inpTrain = inpTrain.copy()
+            self.outTrain = outTrain.copy()
+            self.timeTrain = timeTrain
+            self.numTrain = inpTrain.shape[1]
+            self._chol_buffer = np.linalg.cholesky(Ktrtr)
+            self._alpha = None
+        else:
+            for index in range(0, inpTrain.shape[1]):
+                self.trainGPIterative(inpTrain[:,index], outTrain[index], timeTrain[index])
 
-        self.priorCovariance = Ktrtr
-        self.priorCovariance_inv = np.linalg.inv(Ktrtr)        
+        self.forget(np.nanmax(timeTrain) if not np.all(np.isnan(timeTrain)) else None)
 
-    def update_grid(self, height, width, resolution=1):
+    """
+    Evaluate the posterior mean on a (height/resolution, width/resolution) grid and store it in self.map.
+    The grid is processed in blocks of rows, so peak memory is bounded by gridChunkElements
+    (number of kernel entries per block) instead of growing with numTrain*H*W.
+    keep_layers - also store grid_layers (numTrain, H, W), the contribution of each training output
+                  to the map, which is required by update_grid_map
+    chunk_rows - number of grid rows per block (computed from gridChunkElements if None)
+    """
+    def update_grid(self, height, width, resolution=1, keep_layers=False, chunk_rows=None):
  
         self.grid_size = np.array([height/resolution, width/resolution]).astype(int)
         map = np.zeros(self.grid_size)
+        self.grid_layers = None
 
         if self.numTrain > 0: 
 
-            self.grid_layers = np.zeros([self.numTrain, self.grid_size[0], self.grid_size[1]])
+            if keep_layers:
+                self.grid_layers = np.zeros([self.numTrain, self.grid_size[0], self.grid_size[1]])
 
-            K_star_f = np.zeros(self.numTrain) 
-            for y in range(0, self.grid_size[0]):
-                for x in range(0, self.grid_size[1]):
-                    pt = resolution*np.array([x,y]).reshape([2,1])
-                    distance = np.linalg.norm(pt-self.inpTrain,axis=0)
-                    K_star_f = self.kernel(distance)
-                    self.grid_layers[:,y,x] = K_star_f @ self.priorCovariance_inv  
-            
-            for i in range(0, self.numTrain):
-                map += self.outTrain[i] * self.grid_layers[i]
+            basis = self.basis
+            if keep_layers and self.method != 'exact':
+                Kmn_scaled = self.kernel(self.inducingPoints, self.inpTrain) / self._sparse_lambda
+
+            if chunk_rows is None:
+                chunk_rows = self.gridChunkElements // max(max(self.numTrain, basis.shape[1])*self.grid_size[1], 1)
+            chunk_rows = int(max(chunk_rows, 1))
+
+            x = resolution*np.arange(0, self.grid_size[1])
+            for row in range(0, self.grid_size[0], chunk_rows):
+                y = resolution*np.arange(row, min(row + chunk_rows, self.grid_size[0]))
+                X, Y = np.meshgrid(x, y)
+                pts = np.stack((X.reshape(-1), Y.reshape(-1)))
+
+                K_star_f = self.kernel(basis, pts)
+                map[row:row+len(y),:] = (K_star_f.T @ self.alpha).reshape([len(y), len(x)])
+
+                if keep_layers:
+                    if self.method == 'exact':
+                        layers = cho_solve((self.cholFactor, True), K_star_f, check_finite=False)
+                    else:
+                        layers = Kmn_scaled.T @ cho_solve((self.sparseFactor, True), K_star_f, check_finite=False)
+                    self.grid_layers[:,row:row+len(y),:] = layers.reshape([self.numTrain, len(y), len(x)])
         
         self.map = map
     
+    """
+    Fast map refresh after the output of training sample pos changed to data.
+    Requires a previous call to update_grid(..., keep_layers=True)
+    """
     def update_grid_map(self, pos, data):
+        if self.grid_layers is None:
+            raise Exception("[GP] update_grid_map requires update_grid(..., keep_layers=True)")
         self.map += (data-self.outTrain[pos])*self.grid_layers[pos]
+        if self.method != 'exact':
+            Kmn = self.kernel(self.inducingPoints, self.inpTrain[:,[pos]])[:,0]
+            self._sparse_b += Kmn*(data-self.outTrain[pos])/self._sparse_lambda[pos]
         self.outTrain[pos] = data
+        self._alpha = None
+
     """
     trainModelIterative(inpTrain, outTrain)
-    TODO Implement
+    Online training: appends a single sample and extends the Cholesky factor by one row/column.
+    With L the current factor and k the covariance between the new input and the training set,
+    the new row is l = L^-1 k and the new diagonal entry is sqrt(k(x,x) + noise - l.l), which costs
+    O(numTrain^2) instead of refactorizing the whole matrix.
 
     Necessary function arguments:
     inpTrain - (numDim, 1) numpy array
     outTrain - 1 float
-     """
-    def trainGPIterative(self, inpTrain, outTrain):
-        pass
+    Optional:
+    t - time stamp of the sample (required by maxAge)
+    """
+    def trainGPIterative(self, inpTrain, outTrain, t=None):
+        inpTrain = np.asarray(inpTrain, dtype=float).reshape([-1,1])
+        timeTrain = np.array([np.nan if t is None else t], dtype=float)
+
+        if self.method != 'exact':
+            self._train_sparse(inpTrain, np.array([outTrain], dtype=float).reshape(-1), timeTrain)
+            self.forget(t)
+            return
+
+        Ktete = self.kernel.diag(inpTrain)[0] + self.noiseCov + self.jitter
+
+        if self.numTrain == 0:
+            self.inpTrain = inpTrain.copy()
+            self.outTrain = np.array([outTrain], dtype=float)
+            self.timeTrain = timeTrain
+            self._chol_buffer = np.array([[np.sqrt(Ktete)]])
+            self.numTrain = 1
+            self._alpha = None
+            self.forget(t)
+            return
+
+        Ktrte = self.kernel(self.inpTrain, inpTrain)[:,0]
+        row = solve_triangular(self.cholFactor, Ktrte, lower=True, check_finite=False)
+        # Guard against round-off making the Schur complement negative for (nearly) repeated inputs
+        diagonal = np.sqrt(max(Ktete - row @ row, self.jitter))
+
+        # Grow the factor buffer geometrically so appending is amortized O(numTrain)
+        n = self.numTrain
+        if n == self._chol_buffer.shape[0]:
+            buffer = np.zeros([2*n, 2*n])
+            buffer[:n,:n] = self._chol_buffer
+            self._chol_buffer = buffer
+        self._chol_buffer[n,:n] = row
+        self._chol_buffer[n,n] = diagonal
+
+        self.inpTrain = np.hstack([self.inpTrain, inpTrain])
+        self.outTrain = np.hstack([self.outTrain, outTrain])
+        self.timeTrain = np.hstack([self.timeTrain, timeTrain])
+        self.numTrain += 1
+        self._alpha = None
+        self.forget(t)
 
     """
-    Evaluate GP to obtain mean and value at a testing point
-    inpTest is (numDim,1) numpy array
+    Remove training sample index from the model in O(numTrain^2) (exact) or O(numInducing^2) (sparse).
+    Deleting row/column k of the Cholesky factor L = [[L11, 0, 0], [l21, l22, 0], [L31, l32, L33]]
+    leaves [[L11, 0], [L31, L33']] with L33' L33'^T = L33 L33^T + l32 l32^T, a rank-one modification
+    of the trailing block. The sparse statistics simply subtract the contribution of the sample.
     """
-    def predict_value(self, inpTest):
+    def remove_sample(self, index):
+        n = self.numTrain
+        if self.method == 'exact':
+            B = self._chol_buffer
+            column = B[index+1:n, index].copy()
+            B[index:n-1,:n] = B[index+1:n,:n]
+            B[:n-1,index:n-1] = B[:n-1,index+1:n]
+            B[n-1,:n] = 0.
+            B[:n,n-1] = 0.
+            _cholesky_rank_one_update(B[index:n-1, index:n-1], column)
+        else:
+            Kmn = self.kernel(self.inducingPoints, self.inpTrain[:,[index]])[:,0]
+            lam = self._sparse_lambda[index]
+            self._sparse_A -= np.outer(Kmn, Kmn)/lam
+            self._sparse_b -= Kmn*self.outTrain[index]/lam
+            self._sparse_lambda = np.delete(self._sparse_lambda, index)
+            self._sparse_factor = None
 
-        Ktrte = np.zeros([self.numTrain,1])
+        self.inpTrain = np.delete(self.inpTrain, index, axis=1)
+        self.outTrain = np.delete(self.outTrain, index)
+        self.timeTrain = np.delete(self.timeTrain, index)
+        self.numTrain -= 1
+        self.grid_layers = None
+        self._alpha = None
 
-        for index in range(0,self.numTrain):
-            Ktrte[index] = self.kernel(self.inpTrain[:,index], inpTest)
+    """
+    Apply the forgetting policy: drop samples older than maxAge with respect to time t and
+    prune the training set down to windowSize samples
+    """
+    def forget(self, t=None):
+        if self.maxAge is not None and t is not None:
+            for index in np.flatnonzero(t - self.timeTrain > self.maxAge)[::-1]:
+                self.remove_sample(index)
 
-        Ktrtr = self.priorCovariance
+        while self.windowSize is not None and self.numTrain > self.windowSize:
+            if self.pruning == 'oldest':
+                # Samples are stored in arrival order
+                index = 0
+            else:
+                # Leave-one-out variance of sample i is 1/[K^-1]_ii (minus noise): the most redundant
+                # sample has the largest diagonal of K^-1 = L^-T L^-1. O(windowSize^3), bounded
+                Linv = solve_triangular(self.cholFactor, np.eye(self.numTrain), lower=True, check_finite=False)
+                index = np.argmax(np.einsum('ij,ij->j', Linv, Linv))
+            self.remove_sample(index)
 
-        Ktete = self.kernel(inpTest, inpTest)
+    """
+    Points the posterior mean is expanded on: the training inputs (exact) or the inducing points (sparse)
+    """
+    @property
+    def basis(self):
+        return self.inpTrain if self.method == 'exact' else self.inducingPoints
+
+    """
+    Weights alpha such that the posterior mean is K(basis, inpTest).T @ alpha, i.e.
+    (Ktrtr + noise*I)^-1 outTrain for the exact method and A^-1 b for the sparse methods
+    """
+    @property
+    def alpha(self):
+        if self._alpha is None:
+            if self.method == 'exact':
+                self._alpha = cho_solve((self.cholFactor, True), self.outTrain, check_finite=False)
+            else:
+                self._alpha = cho_solve((self.sparseFactor, True), self._sparse_b, check_finite=False)
+        return self._alpha
+
+    """
+    Batched GP evaluation at many testing points
+    inpTest - (numDim, numTest) numpy array
+    return_var - also return the posterior variance at each testing point
+    returns mu_hat (numTest,) and, if requested, var_hat (numTest,)
+    """
+    def predict(self, inpTest, return_var=True):
+        inpTest = np.asarray(inpTest, dtype=float)
+        if inpTest.ndim == 1:
+            inpTest = inpTest.reshape([-1,1])
+        numTest = inpTest.shape[1]
 
-        mu_hat = Ktrte.T @ np.linalg.inv(Ktrtr + self.noiseCov*np.eye(self.numTrain))  @ self.outTrain
+        if self.numTrain == 0:
+            mu_hat = np.zeros(numTest)
+            var_hat = self.kernel.diag(inpTest)
+            return (mu_hat, var_hat) if return_var else mu_hat
 
-        var_hat = Ktete - Ktrte.T @ np.linalg.inv(Ktrtr + self.noiseCov*np.eye(self.numTrain)) @ Ktrte
+        # Cross-covariance for all testing points in a single kernel evaluation
+        Ktrte = self.kernel(self.basis, inpTest)
 
-        return mu_hat, var_hat
+        mu_hat = Ktrte.T @ self.alpha
+
+        if not return_var:
+            return mu_hat
+
+        if self.method == 'exact':
+            v = solve_triangular(self.cholFactor, Ktrte, lower=True, check_finite=False)
+            var_hat = self.kernel.diag(inpTest) - np.einsum('ij,ij->j', v, v)
+        else:
+            w = solve_triangular(self.sparseFactor, Ktrte, lower=True, check_finite=False)
+            var_hat = np.einsum('ij,ij->j', w, w)
+            if self.method == 'fitc':
+                v = solve_triangular(self._Lmm, Ktrte, lower=True, check_finite=False)
+                var_hat += self.kernel.diag(inpTest) - np.einsum('ij,ij->j', v, v)
+
+        return mu_hat, np.maximum(var_hat, 0.)
+
+    """
+    Evaluate GP to obtain mean and value at a testing point
+    inpTest is (numDim,1) numpy array
+    """
+    def predict_value(self, inpTest):
+        mu_hat, var_hat = self.predict(np.asarray(inpTest).reshape([-1,1]))
+
+        return mu_hat[0], var_hat[0]
 
     """
     Evaluate GP on a grid
@@ -123,22 +402,77 @@ class GPRegression(GaussianProcess):
     def predict_grid_value(self, xmin, xmax, gridSize=10):
         if np.array(gridSize).size == 1:
             gridSize = np.ones(2)*gridSize
+        gridSize = np.asarray(gridSize).astype(int)
             
         x0 = np.linspace(xmin[0], xmax[0], gridSize[0])
         x1 = np.linspace(xmin[1], xmax[1], gridSize[1])
         X0, X1 = np.meshgrid(x0,x1)
         xTest = np.stack((X0.reshape(X0.shape[0]*X0.shape[1]), \
                             X1.reshape(X1.shape[0]*X1.shape[1]) ))
-           
-        numPts = int(gridSize[0]*gridSize[1])
-        ypred = np.zeros(numPts)
-        var_pred = np.zeros(numPts)
-        for index in range(0,numPts):
-            ypred[index], var_pred[index] = self.predict_value(xTest[:,index])
+
+        ypred, var_pred = self.predict(xTest)
 
         return X0, X1, ypred, var_pred          
 
 
+    """
+    Rebuild the model (factor or sparse statistics) from the stored training set,
+    e.g. after the hyperparameters have changed
+    """
+    def retrain(self):
+        inpTrain, outTrain, timeTrain = self.inpTrain, self.outTrain, self.timeTrain
+
+        self.inpTrain = None
+        self.outTrain = None
+        self.timeTrain = None
+        self.numTrain = 0
+        self.grid_layers = None
+        self._chol_buffer = np.zeros([0,0])
+        self._alpha = None
+        if self.method != 'exact':
+            self._init_sparse()
+
+        if inpTrain is not None:
+            self.trainGP(inpTrain, outTrain, timeTrain)
+
+    """
+    Fit the kernel hyperparameters and measurementNoiseCov by maximising the (exact) log marginal likelihood
+    of the current training set. The optimisation runs in log space with analytic gradients;
+    each evaluation factorizes the covariance once and reuses the factor for the gradient.
+    restarts - number of extra optimisations started from random points within bounds
+    processes - run the restarts on a process pool with this many workers (sequential if None)
+    bounds - [(min, max)] for each kernel hyperparameter followed by measurementNoiseCov
+             (kernel.bounds and (1e-6, 1e2) if None)
+    seed - seed for the random restarts
+    returns the optimal log marginal likelihood
+    """
+    def fit_hyperparameters(self, restarts=0, processes=None, bounds=None, seed=None):
+        if self.numTrain == 0:
+            raise Exception("[GP] Cannot fit hyperparameters without training data")
+
+        if bounds is None:
+            bounds = self.kernel.bounds + [(1e-6, 1e2)]
+        log_bounds = np.log(np.array(bounds, dtype=float))
+
+        theta0 = np.hstack([self.kernel.theta, np.log(max(self.noiseCov, bounds[-1][0]))])
+        rng = np.random.default_rng(seed)
+        starts = [np.clip(theta0, log_bounds[:,0], log_bounds[:,1])]
+        starts += [rng.uniform(log_bounds[:,0], log_bounds[:,1]) for _ in range(0, restarts)]
+
+        args = [(theta, self.kernel, self.inpTrain, self.outTrain, self.jitter, log_bounds) for theta in starts]
+        if processes is not None and len(starts) > 1:
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                results = list(pool.map(_optimize_hyperparameters, *zip(*args)))
+        else:
+            results = [_optimize_hyperparameters(*arg) for arg in args]
+
+        theta, nlml = min(results, key=lambda result: result[1])
+        self.kernel.theta = theta[:-1]
+        self.noiseCov = np.exp(theta[-1])
+        self.retrain()
+
+        return -nlml
+
     def plot_grid(self, xmin, xmax, gridSize=10):
         if np.array(gridSize).size == 1:
             gridSize = np.ones(2)*gridSize
@@ -156,4 +490,51 @@ class GPRegression(GaussianProcess):
         p = ax2.pcolor(X0, X1, var_pred.reshape([X0.shape[0],X0.shape[1]]), cmap=cm.jet, vmin=0, vmax=1)
         cb = h.colorbar(p)
         plt.axis('equal')
-        plt.pause(.1)
\ No newline at end of file
+        plt.pause(.1)
+
+
+"""
+Negative log marginal likelihood of the GP and its gradient with respect to
+theta = [kernel.theta, log(measurementNoiseCov)]. Module level so that it can run on a process pool.
+"""
+def _negative_log_marginal_likelihood(theta, kernel, inpTrain, outTrain, jitter):
+    kernel.theta = theta[:-1]
+    noiseCov = np.exp(theta[-1])
+    numTrain = inpTrain.shape[1]
+
+    Kf = kernel(inpTrain)
+    K = Kf + (noiseCov + jitter)*np.eye(numTrain)
+
+    try:
+        L = np.linalg.cholesky(K)
+    except np.linalg.LinAlgError:
+        return np.inf, np.zeros(len(theta))
+
+    alpha = cho_solve((L, True), outTrain, check_finite=False)
+    nlml = .5*outTrain @ alpha + np.sum(np.log(np.diag(L))) + .5*numTrain*np.log(2*np.pi)
+
+    # d(nlml)/d(theta_j) = 0.5 tr((K^-1 - alpha alpha^T) dK/dtheta_j)
+    W = cho_solve((L, True), np.eye(numTrain), check_finite=False) - np.outer(alpha, alpha)
+    grad = .5*np.hstack([np.einsum('ij,ijk->k', W, kernel.gradient(inpTrain)),
+                         noiseCov*np.trace(W)])
+
+    return nlml, grad
+
+def _optimize_hyperparameters(theta0, kernel, inpTrain, outTrain, jitter, log_bounds):
+    kernel = deepcopy(kernel)
+    result = minimize(_negative_log_marginal_likelihood, theta0, args=(kernel, inpTrain, outTrain, jitter),
+                      jac=True, method='L-BFGS-B', bounds=log_bounds)
+    return result.x, result.fun
+
+"""
+In-place update of the lower Cholesky factor L (n, n) so that L L^T becomes L L^T + x x^T, O(n^2)
+"""
+def _cholesky_rank_one_update(L, x):
+    x = x.copy()
+    for k in range(0, len(x)):
+        r = np.hypot(L[k,k], x[k])
+        c = r / L[k,k]
+        s = x[k] / L[k,k]
+        L[k,k] = r
+        L[k+1:,k] = (L[k+1:,k] + s*x[k+1:]) / c
+        x[k+1:] = c*x[k+1:] - s*L[k+1:,k]
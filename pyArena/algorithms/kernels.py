@@ -0,0 +1,237 @@
+"""
+Summary: Covariance functions for Gaussian processes. A kernel object evaluates the full covariance
+matrix between the columns of two (numDim, n) and (numDim, m) input arrays in a single NumPy call:
+
+    kernel = SquaredExponential(sigma=1., length=2.) + Matern32(sigma=.5, length=np.array([1., 4.]))
+    K = kernel(inp1, inp2)      # (n, m) numpy array
+
+Hyperparameters are exposed in log space through the theta property, together with the
+gradient of the covariance matrix with respect to theta, which is what GPRegression uses to
+fit them. A length scale given as an array with one entry per input dimension gives an
+automatic relevance determination (ARD) kernel.
+"""
+
+import numpy as np
+from abc import ABC, abstractmethod
+from scipy.spatial.distance import cdist
+
+## Kernel (abstract) class ##
+class Kernel(ABC):
+
+    """
+    Covariance matrix between the columns of inp1 (numDim, n) and inp2 (numDim, m)
+    """
+    @abstractmethod
+    def __call__(self, inp1, inp2=None):
+        pass
+
+    """
+    Diagonal of the covariance matrix of inp (numDim, n) with itself, as a (n,) numpy array
+    """
+    @abstractmethod
+    def diag(self, inp):
+        pass
+
+    """
+    Derivative of the covariance matrix of inp with itself with respect to theta, (n, n, numParams)
+    """
+    @abstractmethod
+    def gradient(self, inp):
+        pass
+
+    """
+    Log of the hyperparameters, as a 1D numpy array
+    """
+    @property
+    @abstractmethod
+    def theta(self):
+        pass
+
+    @theta.setter
+    @abstractmethod
+    def theta(self, value):
+        pass
+
+    """
+    [(min, max)] of each hyperparameter (not in log space), used as optimisation bounds
+    """
+    @property
+    @abstractmethod
+    def bounds(self):
+        pass
+
+    def __add__(self, other):
+        return Sum(self, other)
+
+    def __mul__(self, other):
+        return Product(self, other)
+
+
+## Stationary (abstract) kernel: k(x1, x2) = sigma^2 f(r2) with r2 = sum_d ((x1_d - x2_d)/length_d)^2 ##
+class StationaryKernel(Kernel):
+
+    def __init__(self, **kwargs):
+        if type(self) is StationaryKernel:
+            raise Exception("Cannot create an instance of abstract class StationaryKernel")
+
+        self.sigma = float(kwargs['sigma']) if 'sigma' in kwargs else 1.0
+        self.length = kwargs['length'] if 'length' in kwargs else 1.0
+        if np.ndim(self.length) > 0:
+            self.length = np.asarray(self.length, dtype=float)
+
+    """
+    Correlation f(r2) and its derivative df/dr2, for the scaled squared distance r2
+    """
+    @abstractmethod
+    def correlation(self, r2):
+        pass
+
+    @abstractmethod
+    def correlation_derivative(self, r2):
+        pass
+
+    def scaled_sq_distance(self, inp1, inp2):
+        length = np.reshape(self.length, [-1,1])
+        return cdist((inp1/length).T, (inp2/length).T, 'sqeuclidean')
+
+    def __call__(self, inp1, inp2=None):
+        if inp2 is None:
+            inp2 = inp1
+        return (self.sigma**2) * self.correlation(self.scaled_sq_distance(inp1, inp2))
+
+    def diag(self, inp):
+        return (self.sigma**2) * np.ones(inp.shape[1])
+
+    def gradient(self, inp):
+        r2 = self.scaled_sq_distance(inp, inp)
+        K = (self.sigma**2) * self.correlation(r2)
+        dK_dr2 = (self.sigma**2) * self.correlation_derivative(r2)
+
+        # dr2/dlog(length_d) = -2 ((x1_d - x2_d)/length_d)^2
+        if np.ndim(self.length) == 0:
+            dK_dlength = (-2*dK_dr2*r2)[:,:,None]
+        else:
+            scaled = inp / self.length.reshape([-1,1])
+            sq_diff = (scaled.T[:,None,:] - scaled.T[None,:,:])**2
+            dK_dlength = -2*dK_dr2[:,:,None]*sq_diff
+
+        return np.concatenate([2*K[:,:,None], dK_dlength], axis=2)
+
+    @property
+    def theta(self):
+        return np.log(np.hstack([self.sigma, self.length]))
+
+    @theta.setter
+    def theta(self, value):
+        value = np.exp(value)
+        self.sigma = value[0]
+        self.length = value[1] if np.ndim(self.length) == 0 else value[1:1+self.length.size].copy()
+
+    @property
+    def bounds(self):
+        return [(1e-3, 1e3)] + [(1e-2, 1e3)]*np.size(self.length)
+
+class SquaredExponential(StationaryKernel):
+
+    def correlation(self, r2):
+        return np.exp(-.5*r2)
+
+    def correlation_derivative(self, r2):
+        return -.5*np.exp(-.5*r2)
+
+class Matern32(StationaryKernel):
+
+    def correlation(self, r2):
+        r = np.sqrt(3*r2)
+        return (1 + r)*np.exp(-r)
+
+    def correlation_derivative(self, r2):
+        return -1.5*np.exp(-np.sqrt(3*r2))
+
+class Matern52(StationaryKernel):
+
+    def correlation(self, r2):
+        r = np.sqrt(5*r2)
+        return (1 + r + r**2/3)*np.exp(-r)
+
+    def correlation_derivative(self, r2):
+        r = np.sqrt(5*r2)
+        return -(5./6)*(1 + r)*np.exp(-r)
+
+class RationalQuadratic(StationaryKernel):
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.alpha = float(kwargs['alpha']) if 'alpha' in kwargs else 1.0
+
+    def correlation(self, r2):
+        return (1 + .5*r2/self.alpha)**(-self.alpha)
+
+    def correlation_derivative(self, r2):
+        return -.5*(1 + .5*r2/self.alpha)**(-self.alpha - 1)
+
+    def gradient(self, inp):
+        # dK/dlog(alpha) = K alpha (u/(1+u) - log(1+u)), with u = r2/(2 alpha)
+        u = .5*self.scaled_sq_distance(inp, inp)/self.alpha
+        K = (self.sigma**2)*(1 + u)**(-self.alpha)
+        dK_dalpha = K*self.alpha*(u/(1 + u) - np.log1p(u))
+
+        return np.concatenate([super().gradient(inp), dK_dalpha[:,:,None]], axis=2)
+
+    @property
+    def theta(self):
+        return np.hstack([StationaryKernel.theta.fget(self), np.log(self.alpha)])
+
+    @theta.setter
+    def theta(self, value):
+        StationaryKernel.theta.fset(self, value[:-1])
+        self.alpha = np.exp(value[-1])
+
+    @property
+    def bounds(self):
+        return StationaryKernel.bounds.fget(self) + [(1e-2, 1e2)]
+
+
+## Composite kernels, created with kernel1 + kernel2 and kernel1 * kernel2 ##
+class Sum(Kernel):
+
+    def __init__(self, kernel1, kernel2):
+        self.kernel1 = kernel1
+        self.kernel2 = kernel2
+
+    def __call__(self, inp1, inp2=None):
+        return self.kernel1(inp1, inp2) + self.kernel2(inp1, inp2)
+
+    def diag(self, inp):
+        return self.kernel1.diag(inp) + self.kernel2.diag(inp)
+
+    def gradient(self, inp):
+        return np.concatenate([self.kernel1.gradient(inp), self.kernel2.gradient(inp)], axis=2)
+
+    @property
+    def theta(self):
+        return np.hstack([self.kernel1.theta, self.kernel2.theta])
+
+    @theta.setter
+    def theta(self, value):
+        numParams = len(self.kernel1.theta)
+        self.kernel1.theta = value[:numParams]
+        self.kernel2.theta = value[numParams:]
+
+    @property
+    def bounds(self):
+        return self.kernel1.bounds + self.kernel2.bounds
+
+class Product(Sum):
+
+    def __call__(self, inp1, inp2=None):
+        return self.kernel1(inp1, inp2) * self.kernel2(inp1, inp2)
+
+    def diag(self, inp):
+        return self.kernel1.diag(inp) * self.kernel2.diag(inp)
+
+    def gradient(self, inp):
+        K1 = self.kernel1(inp)
+        K2 = self.kernel2(inp)
+        return np.concatenate([self.kernel1.gradient(inp)*K2[:,:,None],
+                               K1[:,:,None]*self.kernel2.gradient(inp)], axis=2)
@@ -0,0 +1,155 @@
+import numpy as np
+from copy import deepcopy
+
+from .gaussian_process import GaussianProcess, GPRegression
+
+"""
+Local Gaussian process experts for large 2D areas.
+The workspace is partitioned into square tiles of side tileSize starting at origin. Each tile owns a
+GPRegression expert trained only with the samples that fall inside the tile grown by overlap on every
+side, so training and prediction costs depend on the local sample density instead of the total number
+of samples. Predictions are blended with weights that ramp linearly across the overlap band and sum
+to one, which keeps the map continuous at tile borders. Areas without any expert fall back to the prior.
+"""
+class LocalGPExperts(GaussianProcess):
+
+    def __init__(self, **kwargs):
+
+        super().__init__(**kwargs)
+
+        if 'tileSize' not in kwargs:
+            raise KeyError("[GP] Must specify the tileSize of the local experts")
+
+        self.tileSize = float(kwargs['tileSize'])
+        self.overlap = float(kwargs['overlap']) if 'overlap' in kwargs else self.tileSize/4.
+        self.origin = np.asarray(kwargs['origin'], dtype=float) if 'origin' in kwargs else np.zeros(2)
+
+        if self.overlap > self.tileSize/2.:
+            raise KeyError("[GP] The overlap must be at most half of the tileSize")
+
+        # Remaining arguments configure each expert
+        self.kwargsGP = {key: value for key, value in kwargs.items() if key not in ['tileSize', 'overlap', 'origin']}
+        self.prior = GPRegression(**deepcopy(self.kwargsGP))
+
+        # Experts indexed by the integer tile coordinates (i, j)
+        self.experts = dict()
+        self.numTrain = 0
+
+    """
+    Indices (i, j) of every tile whose grown region contains position (2,)
+    """
+    def tiles_at(self, position):
+        low = np.floor((position - self.origin - self.overlap) / self.tileSize).astype(int)
+        high = np.floor((position - self.origin + self.overlap) / self.tileSize).astype(int)
+        return [(i, j) for i in range(low[0], high[0]+1) for j in range(low[1], high[1]+1)]
+
+    """
+    Blending weight of tile (i, j) at the columns of inp (2, n). Along each axis the weight is 1 inside
+    the tile shrunk by overlap and ramps linearly to 0 at the tile grown by overlap, so the weights of
+    neighbouring tiles add up to 1.
+    """
+    def tile_weight(self, tile, inp):
+        lower = self.origin + self.tileSize*np.array(tile)
+        weight = np.ones(inp.shape[1])
+        for dim in range(0, 2):
+            coordinate = inp[dim] - lower[dim]
+            distance = np.minimum(coordinate, self.tileSize - coordinate)
+            if self.overlap > 0:
+                weight *= np.clip(.5 + distance/(2*self.overlap), 0., 1.)
+            else:
+                weight *= (distance >= 0)
+        return weight
+
+    def expert(self, tile):
+        if tile not in self.experts:
+            self.experts[tile] = GPRegression(**deepcopy(self.kwargsGP))
+        return self.experts[tile]
+
+    """
+    Append a batch of samples to the experts of all tiles containing them
+    inpTrain - (2, numTrain) numpy array or (2,) for a single sample
+    outTrain - (numTrain,) numpy array
+    t - time stamp of the samples, scalar or (numTrain,) numpy array
+    """
+    def trainGP(self, inpTrain, outTrain, t=None):
+        inpTrain = np.asarray(inpTrain, dtype=float)
+        if inpTrain.ndim == 1:
+            inpTrain = inpTrain.reshape([-1,1])
+        outTrain = np.asarray(outTrain, dtype=float).reshape(-1)
+        timeTrain = np.broadcast_to(np.nan if t is None else np.asarray(t, dtype=float), outTrain.shape)
+
+        members = dict()
+        for index in range(0, inpTrain.shape[1]):
+            for tile in self.tiles_at(inpTrain[:,index]):
+                members.setdefault(tile, []).append(index)
+
+        for tile, indices in members.items():
+            times = timeTrain[indices]
+            self.expert(tile).trainGP(inpTrain[:,indices], outTrain[indices], None if np.all(np.isnan(times)) else times)
+
+        self.numTrain += inpTrain.shape[1]
+
+    def trainGPIterative(self, inpTrain, outTrain, t=None):
+        inpTrain = np.asarray(inpTrain, dtype=float).reshape(-1)
+        for tile in self.tiles_at(inpTrain):
+            self.expert(tile).trainGPIterative(inpTrain, outTrain, t)
+        self.numTrain += 1
+
+    """
+    Blended prediction at the columns of inpTest (2, numTest)
+    returns mu_hat (numTest,) and, if requested, var_hat (numTest,)
+    """
+    def predict(self, inpTest, return_var=True):
+        inpTest = np.asarray(inpTest, dtype=float)
+        if inpTest.ndim == 1:
+            inpTest = inpTest.reshape([-1,1])
+        numTest = inpTest.shape[1]
+
+        weight_sum = np.zeros(numTest)
+        mu_hat = np.zeros(numTest)
+        second_moment = np.zeros(numTest)
+
+        for tile, expert in self.experts.items():
+            weight = self.tile_weight(tile, inpTest)
+            active = np.flatnonzero(weight > 0)
+            if len(active) == 0:
+                continue
+            mu, var = expert.predict(inpTest[:,active])
+            weight_sum[active] += weight[active]
+            mu_hat[active] += weight[active]*mu
+            second_moment[active] += weight[active]*(var + mu**2)
+
+        if not return_var:
+            return mu_hat
+
+        # Uncovered areas take the prior (zero mean) for the remaining weight
+        second_moment += np.maximum(1. - weight_sum, 0.)*self.prior.kernel.diag(inpTest)
+        var_hat = np.maximum(second_moment - mu_hat**2, 0.)
+
+        return mu_hat, var_hat
+
+    """
+    Evaluate the blended posterior mean on a (height/resolution, width/resolution) grid, in the same
+    layout as GPRegression.update_grid. Each expert is only evaluated on the grid block under its tile.
+    """
+    def update_grid(self, height, width, resolution=1):
+
+        self.grid_size = np.array([height/resolution, width/resolution]).astype(int)
+        map = np.zeros(self.grid_size)
+
+        for tile, expert in self.experts.items():
+            lower = self.origin + self.tileSize*np.array(tile) - self.overlap
+            upper = lower + self.tileSize + 2*self.overlap
+            columns = np.arange(max(int(np.ceil(lower[0]/resolution)), 0), min(int(np.floor(upper[0]/resolution))+1, self.grid_size[1]))
+            rows = np.arange(max(int(np.ceil(lower[1]/resolution)), 0), min(int(np.floor(upper[1]/resolution))+1, self.grid_size[0]))
+            if len(columns) == 0 or len(rows) == 0:
+                continue
+
+            X, Y = np.meshgrid(resolution*columns, resolution*rows)
+            pts = np.stack((X.reshape(-1), Y.reshape(-1)))
+            weight = self.tile_weight(tile, pts)
+
+            map[rows[0]:rows[-1]+1, columns[0]:columns[-1]+1] += \
+                (weight*expert.predict(pts, return_var=False)).reshape([len(rows), len(columns)])
+
+        self.map = map
@@ -1 +1 @@
-__all__ =  ["conversion"]
+__all__ =  ["conversion", "plotting"]
@@ -0,0 +1,155 @@
+"""
+Summary: Online trajectory visualization decoupled from the control loop.
+
+TrajectoryPlot starts a separate plotting process and shares a trajectory buffer with it through
+multiprocessing.shared_memory. The control loop only calls append(), which writes one row of the
+buffer (reference point, vehicle position and heading, optional goal marker) and never touches
+matplotlib, so it never blocks on drawing. The plotting process reads the rows appended since its last
+frame at most rate times per second and redraws the animated lines with blitting over a cached
+background.
+
+The buffer is a ring of capacity rows: once full, the plot shows the last capacity samples.
+close() stops the plotting process and releases the shared memory. It also runs when the TrajectoryPlot
+is garbage collected or at interpreter exit, whichever comes first.
+"""
+
+import time
+import weakref
+import numpy as np
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+# Row layout: reference (x, y), position (x, y), heading, goal (x, y)
+_COLUMNS = 7
+
+## TrajectoryPlot class ##
+class TrajectoryPlot:
+
+    def __init__(self, **kwargs):
+        self.capacity = kwargs['capacity'] if 'capacity' in kwargs else 100000
+        options = {'rate': kwargs['rate'] if 'rate' in kwargs else 20.,
+                   'axis': kwargs['axis'] if 'axis' in kwargs else np.array([-50,50,-50,50]),
+                   'scale': kwargs['scale'] if 'scale' in kwargs else 1.0,
+                   'labels': kwargs['labels'] if 'labels' in kwargs else ("Desired trajectory", "Real trajectory")}
+
+        # Shared buffer: [count | stop | rows[capacity, _COLUMNS]]
+        self.block = shared_memory.SharedMemory(create=True, size=8*(2 + self.capacity*_COLUMNS))
+        self.header = np.ndarray((2,), dtype=np.int64, buffer=self.block.buf)
+        self.rows = np.ndarray((self.capacity, _COLUMNS), dtype=np.float64, buffer=self.block.buf, offset=16)
+        self.header[:] = 0
+
+        # Fork when available: spawn would re-run the (unguarded) example scripts in the child
+        context = mp.get_context('fork') if 'fork' in mp.get_all_start_methods() else mp.get_context()
+        self.process = context.Process(target=_plot_process, args=(self.block.name, self.capacity, options), daemon=True)
+        self.process.start()
+
+        # Release the process and the shared memory even if close() is never called
+        self.finalizer = weakref.finalize(self, _release, self.block, self.process)
+
+    """
+    Append one sample (called from the control loop, does not block)
+    reference - (2,) reference point, position - (2,) vehicle position, heading - vehicle heading [rad]
+    goal - optional (2,) goal marker (e.g. the current waypoint)
+    """
+    def append(self, reference, position, heading, goal=None):
+        n = self.header[0]
+        row = self.rows[n % self.capacity]
+        row[0:2] = reference
+        row[2:4] = position
+        row[4] = heading
+        row[5:7] = np.nan if goal is None else goal
+        # Publish the row only once it is complete
+        self.header[0] = n + 1
+
+    def close(self):
+        self.header = None
+        self.rows = None
+        self.finalizer()
+
+"""
+Stop the plotting process and release the shared buffer (runs once, from close() or the finalizer)
+"""
+def _release(block, process):
+    # Stop flag, through a view that is dropped before closing the block
+    np.ndarray((2,), dtype=np.int64, buffer=block.buf)[1] = 1
+    process.join(1.)
+    if process.is_alive():
+        process.terminate()
+    block.close()
+    block.unlink()
+
+"""
+Plotting process: draws the rows appended to the shared buffer at most options['rate'] times per second
+"""
+def _plot_process(name, capacity, options):
+    import matplotlib.pyplot as plt
+
+    block = shared_memory.SharedMemory(name=name)
+    header = np.ndarray((2,), dtype=np.int64, buffer=block.buf)
+    rows = np.ndarray((capacity, _COLUMNS), dtype=np.float64, buffer=block.buf, offset=16)
+
+    # Local copy of the ring, and its rows in chronological order once it has wrapped
+    trajectory = np.zeros([capacity, _COLUMNS])
+    ordered = np.zeros([capacity, _COLUMNS])
+    vehicle_contour = options['scale']*np.array([[-1,2,-1,-1],[-1,0,1,-1]])
+
+    fig, ax = plt.subplots()
+    ax.axis(options['axis'])
+    ax.grid()
+    traj_line, = ax.plot([], [], '--k', label=options['labels'][0], animated=True)
+    state_line, = ax.plot([], [], '-b', label=options['labels'][1], animated=True)
+    vehicle_marker, = ax.plot([], [], color='g', animated=True)
+    goal_marker, = ax.plot([], [], 'xr', label='WP', animated=True)
+    artists = [traj_line, state_line, vehicle_marker, goal_marker]
+    ax.legend(handles=[traj_line, state_line, goal_marker])
+
+    # Cache the static background, again after every full redraw (e.g. window resize)
+    background = [None]
+    def capture_background(event):
+        background[0] = fig.canvas.copy_from_bbox(ax.bbox)
+    fig.canvas.mpl_connect('draw_event', capture_background)
+    plt.show(block=False)
+    plt.pause(.1)
+
+    period = 1./options['rate']
+    read = 0
+    while header[1] == 0 and plt.fignum_exists(fig.number):
+        start = time.perf_counter()
+
+        # Copy the rows appended since the last frame
+        count = int(header[0])
+        if count - read > capacity:
+            read = count - capacity
+        index = np.arange(read, count) % capacity
+        trajectory[index] = rows[index]
+        read = count
+
+        if count > 0:
+            if count <= capacity:
+                samples = trajectory[0:count]
+            else:
+                oldest = count % capacity
+                ordered[0:capacity - oldest] = trajectory[oldest:]
+                ordered[capacity - oldest:] = trajectory[0:oldest]
+                samples = ordered
+            last = samples[-1]
+            R = np.array([[np.cos(last[4]), -np.sin(last[4])], [np.sin(last[4]), np.cos(last[4])]])
+            current_vehicle_contour = R@vehicle_contour + last[2:4].reshape(2,1)
+
+            traj_line.set_data(samples[:,0], samples[:,1])
+            state_line.set_data(samples[:,2], samples[:,3])
+            vehicle_marker.set_data(current_vehicle_contour[0], current_vehicle_contour[1])
+            goal_marker.set_data(last[5:6], last[6:7])
+
+            if background[0] is not None:
+                fig.canvas.restore_region(background[0])
+                for artist in artists:
+                    ax.draw_artist(artist)
+                fig.canvas.blit(ax.bbox)
+
+        fig.canvas.flush_events()
+        time.sleep(max(period - (time.perf_counter() - start), 0.))
+
+    header = None
+    rows = None
+    block.close()
@@ -1,7 +1,7 @@
 from ..core import controller
 
 import numpy as np
-import matplotlib.pyplot as plt
+from ..common.plotting import TrajectoryPlot
 
 """
 Waypoint control for 2D vehicles
@@ -18,17 +18,16 @@ class LOSUnicycle(controller.StaticController):
         # Initializing variables
         self.wp_final = None
         self.wp_init = None
+        # Per-vehicle initial waypoints when guiding a fleet (see compute_input_batch)
+        self.wp_init_batch = None
 
-        # Plot configuration
+        # Plot configuration (drawn by a separate process)
         if (self.draw_plot):
-            self.vehicle_contour= scale * np.array([[-1,2,-1,-1],[-1,0,1,-1]])
-            plt.axis(axis)
-            plt.ion()
-            plt.show()
+            rate = kwargs['plot_rate'] if 'plot_rate' in kwargs else 20.
+            self.plotter = TrajectoryPlot(axis=axis, scale=scale, rate=rate, labels=("Reference path", "Real "))
 
         # Flags
         self.has_waypoint = False    
-        self.is_plot_ready = False
 
         # Initializing parent class
         kwargsController = {'x_dimension': 3, 'u_dimension': 2}
@@ -44,6 +43,7 @@ class LOSUnicycle(controller.StaticController):
         self.look_ahead = lookahead
 
         self.wp_init = None
+        self.wp_init_batch = None
         self.has_reached_waypoint = False
         self.has_waypoint = True
 
@@ -54,6 +54,7 @@ class LOSUnicycle(controller.StaticController):
 
         if (self.wp_final is not None):
             self.wp_init = self.wp_final
+            self.wp_init_batch = None
             self.wp_final = ref
             path = (self.wp_final - self.wp_init).reshape(2,1)
             self.proj_operator = path @ path.T / (path.T@path)
@@ -67,8 +68,12 @@ class LOSUnicycle(controller.StaticController):
 
     """
     Guidance algorithm
+    x - (3,) pose of a vehicle, or (N, 3) poses of a fleet (see compute_input_batch)
     """
     def compute_input(self, t, x):
+        if np.ndim(x) == 2:
+            return self.compute_input_batch(t, x)
+
         # In case of no waypoiny, send zero velocity commands 
         if not self.has_waypoint:
             return np.array([0.,0.])
@@ -105,28 +110,52 @@ class LOSUnicycle(controller.StaticController):
         return np.array([v_lin, w_ang])
 
     """
-    Plot routine for online vizualization
+    Guidance algorithm for a fleet: the line of sight law evaluated for all the N vehicles at once.
+    Without an initial waypoint, each vehicle follows the line from its own initial position.
+    x - (N, 3) numpy array of poses
+    returns (N, 2) numpy array of inputs [v_lin, w_ang]
+    """
+    def compute_input_batch(self, t, x):
+        if not self.has_waypoint:
+            return np.zeros([x.shape[0], 2])
+
+        if self.wp_init is None and self.wp_init_batch is None:
+            self.wp_init_batch = np.array(x[:,0:2])
+        wp_init = self.wp_init_batch if self.wp_init_batch is not None else self.wp_init
+
+        pos = x[:,0:2]
+        heading = x[:,2]
+
+        # Line of sight (LoS) algorithm: cross-track error in the path frame of each vehicle
+        path = self.wp_final - wp_init
+        los_angle = np.arctan2(path[...,1], path[...,0])
+        offset = pos - wp_init
+        cross_track = -np.sin(los_angle)*offset[:,0] + np.cos(los_angle)*offset[:,1]
+        heading_desired = - np.arctan(cross_track/self.look_ahead) + los_angle
+
+        reached = np.linalg.norm(self.wp_final - pos, axis=1) < .1
+        self.has_reached_waypoint = bool(np.all(reached))
+
+        v_lin = np.where(reached, 0., self.speed)
+        w_ang = np.where(reached, 0., -0.6*(heading - heading_desired))
+        return np.stack([v_lin, w_ang], axis=1)
+
+    """
+    Cross-track distance between the vehicle(s) and the current path (zero without waypoint)
+    x - (3,) or (N, 3) numpy array of poses
+    """
+    def tracking_error(self, t, x):
+        wp_init = self.wp_init_batch if (np.ndim(x) == 2 and self.wp_init_batch is not None) else self.wp_init
+        if not self.has_waypoint or wp_init is None:
+            return np.zeros(np.shape(x)[:-1])
+
+        path = self.wp_final - wp_init
+        los_angle = np.arctan2(path[...,1], path[...,0])
+        offset = x[...,0:2] - wp_init
+        return np.abs(-np.sin(los_angle)*offset[...,0] + np.cos(los_angle)*offset[...,1])
+
+    """
+    Plot routine for online vizualization: hands the sample to the plotting process
     """
     def plot(self, pd, p, R):
-        if (self.is_plot_ready == False):
-            # Drawing first frame
-            current_vehicle_contour = R@self.vehicle_contour + p[0:2].reshape(2,1)
-            self.traj_line, self.state_line = plt.plot(pd[0], pd[1],'--k', p[0], p[1], '-b')
-            self.vehicle_marker = plt.plot(current_vehicle_contour[0], current_vehicle_contour[1], color='g')[0]
-            plt.plot(self.wp_final[0], self.wp_final[1],'xr',label='WP')
-            self.traj_line.set_label("Reference path")
-            self.state_line.set_label("Real ")
-            plt.legend()
-            plt.grid()
-            # Update flag to not re-initialize plot
-            self.is_plot_ready = True
-        else:
-            current_vehicle_contour = R@self.vehicle_contour + p[0:2].reshape(2,1)
-            self.traj_line.set_xdata(np.append(self.traj_line._x, pd[0]))
-            self.traj_line.set_ydata(np.append(self.traj_line._y, pd[1]))
-            self.state_line.set_ydata(np.append(self.state_line._y, p[1]))  
-            self.state_line.set_xdata(np.append(self.state_line._x, p[0]))
-            self.vehicle_marker.set_xdata(current_vehicle_contour[0])
-            self.vehicle_marker.set_ydata(current_vehicle_contour[1])                
-            plt.draw()
-            plt.pause(0.0001)
+        self.plotter.append(np.ravel(pd), p[0:2], np.arctan2(R[1,0], R[0,0]), self.wp_final)
@@ -1,7 +1,7 @@
 from ..core import controller
 
 import numpy as np
-import matplotlib.pyplot as plt
+from ..common.plotting import TrajectoryPlot
 
 
 """
@@ -27,15 +27,10 @@ class TrajectoryTracking2D(controller.StaticController):
         # Pre-computing constants
         self.invDelta = np.linalg.pinv(np.array([[1.0, -self.eps[1]], [0.0, self.eps[0]]]))
 
-        # Plot configuration
+        # Plot configuration (drawn by a separate process)
         if (self.draw_plot):
-            self.vehicle_contour= scale * np.array([[-1,2,-1,-1],[-1,0,1,-1]])
-            plt.axis(axis)
-            plt.ion()
-            plt.show()
-        
-        # Flags
-        self.is_plot_ready = False 
+            rate = kwargs['plot_rate'] if 'plot_rate' in kwargs else 20.
+            self.plotter = TrajectoryPlot(axis=axis, scale=scale, rate=rate, labels=("Desired trajectory", "Real trajectory"))
 
         # Initializing parent class
         kwargsController = {'x_dimension': 3, 'u_dimension': 2}
@@ -56,8 +51,12 @@ class TrajectoryTracking2D(controller.StaticController):
 
     """
     Trajectory tracking algorithm
+    x - (3,) pose of a vehicle, or (N, 3) poses of a fleet (see compute_input_batch)
     """
     def compute_input(self, t, x):
+        if np.ndim(x) == 2:
+            return self.compute_input_batch(t, x)
+
         # Current pose of the vehicle
         pos = np.array(x[0:2])
         heading = np.array(x[2])
@@ -79,27 +78,36 @@ class TrajectoryTracking2D(controller.StaticController):
         return u
 
     """
-    Plot routine for online vizualization
+    Trajectory tracking for a fleet: same control law evaluated for all the N vehicles at once
+    x - (N, 3) numpy array of poses
+    returns (N, 2) numpy array of inputs [v_lin, w_ang]
+    """
+    def compute_input_batch(self, t, x):
+        cos_heading = np.cos(x[:,2])
+        sin_heading = np.sin(x[:,2])
+
+        # Trajectory ((2,) shared by all vehicles or (N, 2))
+        pos_des = self.funpd(t)
+        pos_des_dot = self.funpdDot(t)
+
+        # Rot.T @ v for every vehicle
+        rotate = lambda v: np.stack([cos_heading*v[...,0] + sin_heading*v[...,1],
+                                     -sin_heading*v[...,0] + cos_heading*v[...,1]], axis=-1)
+
+        # Control law (u = [v_lin, w_ang])
+        e = rotate(x[:,0:2] - pos_des) + self.eps
+        u_ff = rotate(np.broadcast_to(pos_des_dot, e.shape))
+        return (-e@self.K.T + u_ff)@self.invDelta.T
+
+    """
+    Distance between the vehicle(s) and the desired trajectory at time t
+    x - (3,) or (N, 3) numpy array of poses
+    """
+    def tracking_error(self, t, x):
+        return np.linalg.norm(x[...,0:2] - self.funpd(t), axis=-1)
+
+    """
+    Plot routine for online vizualization: hands the sample to the plotting process
     """
     def plot(self, pd, p, R):
-        if (self.is_plot_ready == False):
-            # Drawing first frame
-            current_vehicle_contour = R@self.vehicle_contour + p[0:2].reshape(2,1)
-            self.traj_line, self.state_line = plt.plot(pd[0], pd[1],'--k', p[0], p[1], '-b')
-            self.vehicle_marker = plt.plot(current_vehicle_contour[0], current_vehicle_contour[1], color='g')[0]
-            self.traj_line.set_label("Desired trajectory")
-            self.state_line.set_label("Real trajectory")
-            plt.legend()
-            plt.grid()
-            # Update flag to not re-initialize plot
-            self.is_plot_ready = True
-        else:
-            current_vehicle_contour = R@self.vehicle_contour + p[0:2].reshape(2,1)
-            self.traj_line.set_xdata(np.append(self.traj_line._x, pd[0]))
-            self.traj_line.set_ydata(np.append(self.traj_line._y, pd[1]))
-            self.state_line.set_ydata(np.append(self.state_line._y, p[1]))  
-            self.state_line.set_xdata(np.append(self.state_line._x, p[0]))
-            self.vehicle_marker.set_xdata(current_vehicle_contour[0])
-            self.vehicle_marker.set_ydata(current_vehicle_contour[1])                
-            plt.draw()
-            plt.pause(0.0001)
+        self.plotter.append(np.ravel(pd), p[0:2], np.arctan2(R[1,0], R[0,0]), None)
@@ -1 +1 @@
-__all__ = ["controller", "system", "sensors","planner","map"]
+__all__ = ["controller", "system", "sensors","planner","map", "integrators", "transport", "simulation", "experiment", "timing", "logger"]
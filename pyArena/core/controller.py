@@ -2,10 +2,8 @@
 import numpy as np
 import time
 from abc import ABC, abstractmethod
-
-# ROS libraries
-import rospy
-from std_msgs.msg import Float32MultiArray
+from .transport import ROSTransport
+from .timing import Timing, timed
 
 ## StaticController (abstract) class ##
 class StaticController(ABC):
@@ -37,45 +35,66 @@ class StaticController(ABC):
         self.real_time = kwargs['real_time']
         self.dt = kwargs['dt']
 
+        # Number of vehicles of a fleet (e.g. UnicycleFleet) controlled through the transport: the state
+        # message is then split into a (numVehicles, x_dimension) array, so that compute_input gets the
+        # whole fleet, and the input message carries the (numVehicles, u_dimension) inputs flattened.
+        # None for a single vehicle.
+        self.numVehicles = kwargs['numVehicles'] if 'numVehicles' in kwargs else None
+
         # Initializing varibles
-        self.x = np.zeros(self.x_dimension)
-        self.u = np.zeros(self.u_dimension)
+        if self.numVehicles is None:
+            self.x = np.zeros(self.x_dimension)
+            self.u = np.zeros(self.u_dimension)
+        else:
+            self.x = np.zeros([self.numVehicles, self.x_dimension])
+            self.u = np.zeros([self.numVehicles, self.u_dimension])
         self.t = 0
 
-        # ROS node/publisher/subscribers
-        rospy.init_node('anonymous', anonymous=True)
-        self.input_pub = rospy.Publisher('input', Float32MultiArray, queue_size=10)
-        rospy.Subscriber("state", Float32MultiArray, self.state_callback)
-        rospy.Subscriber("reference", Float32MultiArray, self.reference_callback)        
+        # Instrumentation (None when disabled)
+        self.timing = Timing() if 'timing' in kwargs and kwargs['timing'] else None
+        self.state_received = 0
+
+        # Transport publisher/subscribers (None runs headless)
+        self.transport = kwargs['transport'] if 'transport' in kwargs else ROSTransport()
+        if self.transport is not None:
+            self.transport.subscribe('state', timed(self.timing, 'state_callback', self.state_callback))
+            self.transport.subscribe('reference', timed(self.timing, 'reference_callback', self.reference_callback))
 
-        # Message
-        self.msg_input = Float32MultiArray()
-        self.msg_input.data = np.zeros(self.u_dimension)
+        # Message: input followed by the time stamp of the state it was computed from
+        self.msg_input = np.zeros(self.u.size+1)
         self.has_new_state_message = False
 
-    def iterate(self, timer): 
+    def iterate(self, now=None): 
         if self.has_new_state_message:
+            if self.timing is not None:
+                self.timing.record('state_age', time.perf_counter() - self.state_received)
             self.u = self.compute_input(self.t, self.x)
             self.has_new_state_message = False
 
         # Assemble and send message
-        for i in range(0, self.u_dimension):
-            self.msg_input.data[i] = self.u[i]
-        self.input_pub.publish(self.msg_input) 
+        self.msg_input[0:self.u.size] = np.ravel(self.u)
+        self.msg_input[self.u.size] = self.t
+        self.transport.publish('input', self.msg_input)
 
-    def state_callback(self,msg):
-        self.t = msg.data[0]
-        for i in range(0, self.x_dimension):
-            self.x[i] = msg.data[i+1]
+    def state_callback(self, data):
+        # A fleet state on a controller built without numVehicles (or the other way round) would
+        # otherwise be silently truncated to its first vehicle
+        if len(data) != self.x.size + 1:
+            raise Exception("[Controller] State message has {} values, expected {} (time and {} states): set numVehicles to control a fleet".format(
+                len(data), self.x.size + 1, self.x.size))
+        self.t = data[0]
+        self.x[...] = np.reshape(data[1:], np.shape(self.x))
         self.has_new_state_message = True
+        if self.timing is not None:
+            self.state_received = time.perf_counter()
 
-        if not self.real_time:
-            self.iterate( rospy.Time.from_sec(0))
+        if not self.real_time and not self.transport.lock_step:
+            self.iterate(self.t)
 
-    def reference_callback(self, msg):
-        ref = np.array(msg.data)
+    def reference_callback(self, data):
+        ref = np.array(data)
         self.update_reference(self.t, ref)
 
     def run(self):
-        if self.real_time:
-            self.timer = rospy.Timer(rospy.Duration(self.dt), self.iterate)
+        if self.real_time or self.transport.lock_step:
+            self.timer = self.transport.timer(self.dt, timed(self.timing, 'iterate', self.iterate, self.dt))
@@ -0,0 +1,127 @@
+"""
+Summary: Parallel Monte-Carlo experiment runner. ExperimentRunner sweeps a grid of parameters and a
+set of random seeds, runs one headless closed-loop Simulation per combination on a process pool, and
+collects the results into a single columnar ResultTable (one numpy array per column).
+
+The experiment is described by a setup function, called in the worker process as
+setup(params, seed) and returning the Simulation kwargs (system, controller, planner, ...), whose
+components must be created with transport=None. The global numpy random state is seeded with seed
+before setup is called. Both setup and the optional metrics function must be defined at module level
+so that they can be sent to the worker processes.
+
+By default the metrics are computed from controller.tracking_error(t, x) along the logged trajectory
+(averaged over the vehicles of a fleet): rms_error, max_error and final_error.
+
+Example:
+
+    def setup(params, seed):
+        vehicle = Unicycle(initialCondition=np.random.randn(3), dt=.01, real_time=False, transport=None)
+        controller = TrajectoryTracking2D(pd=pd, pdDot=pdDot, gain=params['gain'], dt=.05,
+                                          real_time=False, plot=False, transport=None)
+        return {'system': vehicle, 'controller': controller}
+
+    if __name__ == "__main__":
+        runner = ExperimentRunner(setup=setup, parameters={'gain': [K1, K2]}, seeds=10, simTime=60)
+        results = runner.run()
+        print(results['gain_index'], results['rms_error'])
+"""
+
+import os
+import time
+import itertools
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from .simulation import Simulation
+
+## Columnar table of results ##
+class ResultTable(dict):
+
+    def to_dataframe(self):
+        import pandas as pd
+        return pd.DataFrame(dict(self))
+
+    def save(self, path):
+        np.savez_compressed(path, **self)
+
+"""
+Default metrics: statistics of the tracking error of the controller along the trajectory
+"""
+def tracking_metrics(log, simulation):
+    controller = simulation.controller
+    shape = np.shape(simulation.system.x)
+    error = np.array([np.mean(controller.tracking_error(t, x.reshape(shape)))
+                      for t, x in zip(log.time, log.stateTrajectory)])
+    return {'rms_error': np.sqrt(np.mean(error**2)), 'max_error': np.max(error), 'final_error': error[-1]}
+
+def _run_job(setup, metrics, simTime, params, seed):
+    np.random.seed(seed)
+    simulation = Simulation(simTime=simTime, **setup(params, seed))
+
+    start = time.perf_counter()
+    log = simulation.run()
+    result = {'wall_time': time.perf_counter() - start}
+
+    result.update(metrics(log, simulation))
+    return result
+
+## ExperimentRunner class ##
+class ExperimentRunner:
+
+    def __init__(self, **kwargs):
+
+        # Checking for missing parameters
+        if 'setup' not in kwargs:
+            raise KeyError("[Experiment] Must specify the setup(params, seed) function")
+        if 'simTime' not in kwargs:
+            raise KeyError("[Experiment] Must specify the simulation time simTime")
+
+        self.setup = kwargs['setup']
+        self.simTime = kwargs['simTime']
+        self.parameters = kwargs['parameters'] if 'parameters' in kwargs else {}
+        seeds = kwargs['seeds'] if 'seeds' in kwargs else 1
+        self.seeds = list(range(seeds)) if np.isscalar(seeds) else list(seeds)
+        self.metrics = kwargs['metrics'] if 'metrics' in kwargs else tracking_metrics
+        self.processes = kwargs['processes'] if 'processes' in kwargs else os.cpu_count()
+
+    """
+    All (params, seed) combinations of the parameter grid and the seeds, with the index of the value
+    taken by each parameter
+    """
+    def jobs(self):
+        names = list(self.parameters)
+        for indices in itertools.product(*[range(len(self.parameters[name])) for name in names]):
+            params = {name: self.parameters[name][index] for name, index in zip(names, indices)}
+            for seed in self.seeds:
+                yield dict(zip(names, indices)), params, seed
+
+    """
+    Runs all the experiments and returns a ResultTable with one row per (params, seed):
+    <name> (scalar parameters) or <name>_index (position in the list of values), seed and the metrics
+    """
+    def run(self):
+        empty = [name for name in self.parameters if len(self.parameters[name]) == 0]
+        if empty or len(self.seeds) == 0:
+            raise ValueError("[Experiment] No experiment to run: {} has no values".format(
+                "parameter '{}'".format(empty[0]) if empty else 'the list of seeds'))
+
+        jobs = list(self.jobs())
+        args = [(self.setup, self.metrics, self.simTime, params, seed) for _, params, seed in jobs]
+
+        if self.processes is None or self.processes > 1:
+            with ProcessPoolExecutor(max_workers=self.processes) as pool:
+                results = list(pool.map(_run_job, *zip(*args), chunksize=max(len(args)//(4*(self.processes or os.cpu_count())), 1)))
+        else:
+            results = [_run_job(*arg) for arg in args]
+
+        table = ResultTable()
+        for name in self.parameters:
+            if all(np.isscalar(value) for value in self.parameters[name]):
+                table[name] = np.array([params[name] for _, params, _ in jobs])
+            else:
+                table[name + '_index'] = np.array([indices[name] for indices, _, _ in jobs])
+        table['seed'] = np.array([seed for _, _, seed in jobs])
+        for name in results[0]:
+            table[name] = np.array([result[name] for result in results])
+
+        return table
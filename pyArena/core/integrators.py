@@ -0,0 +1,30 @@
+"""
+Summary: Single step integrators for the state equation x' = f(t, x) of a dynamic system.
+Every function advances the state x from time t to t + dt and returns the new state.
+The state may be any numpy array, e.g. (N, 3) for a fleet of N vehicles.
+
+- ode45_step(): adaptive Runge-Kutta 4(5) through scipy's solve_ivp (accurate, large per-call overhead)
+- euler_step(): explicit Euler, one evaluation of f
+- rk4_step(): classical fixed-step Runge-Kutta, four evaluations of f
+
+"""
+
+from scipy.integrate import solve_ivp as ode45
+
+def ode45_step(f, t, x, dt):
+    # solve_ivp works on 1D states
+    shape = x.shape
+    sol = ode45(lambda t, y: f(t, y.reshape(shape)).reshape(-1), [t, t + dt], x.reshape(-1))
+    return sol.y[:,-1].reshape(shape)
+
+def euler_step(f, t, x, dt):
+    return x + dt*f(t, x)
+
+def rk4_step(f, t, x, dt):
+    k1 = f(t, x)
+    k2 = f(t + dt/2, x + dt/2*k1)
+    k3 = f(t + dt/2, x + dt/2*k2)
+    k4 = f(t + dt, x + dt*k3)
+    return x + dt/6*(k1 + 2*k2 + 2*k3 + k4)
+
+integrators = {'ode45': ode45_step, 'euler': euler_step, 'rk4': rk4_step}
@@ -0,0 +1,179 @@
+"""
+Summary: Columnar data logger for the time, state, input, reference and sensor streams of a run.
+Every stream is a time column plus a (samples, dimension) array, stored in preallocated chunks of
+chunkSize rows: appending a sample is a single row write and growing a stream allocates a new chunk
+without copying the previous ones. The columns are assembled (one concatenation) only when read.
+
+- decimation: keep one sample out of every decimation logged on each stream (an int, or a dict
+  {stream: int} for per-stream rates)
+- rotate: once a stream holds rotate samples, every stream is exported to path_<k> and dropped from
+  memory, bounding the memory of long runs (close() exports the remainder)
+- save(path): bulk export to a compressed .npz (arrays <stream>_time and <stream>) or, for a .parquet
+  path, to one Parquet file per stream (pandas with a Parquet engine required)
+
+The headless Simulation returns a DataLogger; it can also record the topics of any transport with
+attach(). The time, stateTrajectory and inputTrajectory attributes give the 'state' and 'input' streams.
+
+Example:
+
+    dataLog = DataLogger(decimation={'state': 10})
+    dataLog.attach(transport)
+    ...
+    plt.plot(dataLog.stateTrajectory[:,0], dataLog.stateTrajectory[:,1])
+    dataLog.save('run.npz')
+"""
+
+import os
+import numpy as np
+
+## Single stream stored in chunks ##
+class LogStream:
+
+    def __init__(self, dimension, chunkSize):
+        self.dimension = dimension
+        self.chunkSize = chunkSize
+        self.clear()
+
+    def clear(self):
+        self.time_chunks = []
+        self.data_chunks = []
+        self.fill = self.chunkSize
+        self.size = 0
+        self.columns = None
+
+    def append(self, t, values):
+        if self.fill == self.chunkSize:
+            self.time_chunks.append(np.empty(self.chunkSize))
+            self.data_chunks.append(np.empty([self.chunkSize, self.dimension]))
+            self.fill = 0
+        self.time_chunks[-1][self.fill] = t
+        self.data_chunks[-1][self.fill] = values
+        self.fill += 1
+        self.size += 1
+        self.columns = None
+
+    """
+    Time (samples,) and data (samples, dimension) arrays of the stream
+    """
+    def arrays(self):
+        if self.columns is None:
+            if len(self.time_chunks) == 0:
+                self.columns = (np.empty(0), np.empty([0, self.dimension]))
+            elif len(self.time_chunks) == 1:
+                self.columns = (self.time_chunks[0][0:self.fill], self.data_chunks[0][0:self.fill])
+            else:
+                self.columns = (np.concatenate(self.time_chunks[:-1] + [self.time_chunks[-1][0:self.fill]]),
+                                np.concatenate(self.data_chunks[:-1] + [self.data_chunks[-1][0:self.fill]]))
+        return self.columns
+
+## DataLogger class ##
+class DataLogger:
+
+    def __init__(self, **kwargs):
+        self.chunkSize = kwargs['chunkSize'] if 'chunkSize' in kwargs else 1024
+        self.decimation = kwargs['decimation'] if 'decimation' in kwargs else 1
+        self.rotate = kwargs['rotate'] if 'rotate' in kwargs else None
+        self.path = kwargs['path'] if 'path' in kwargs else None
+
+        if self.rotate is not None and self.path is None:
+            raise KeyError("[DataLogger] Must specify the path of the files written on rotation")
+
+        self.streams = dict()
+        self.counters = dict()
+        self.num_files = 0
+        self.t = 0
+
+    """
+    Record values (array of any shape, flattened) of stream name at time t
+    """
+    def log(self, name, t, values):
+        count = self.counters.get(name, 0)
+        self.counters[name] = count + 1
+        decimation = self.decimation.get(name, 1) if isinstance(self.decimation, dict) else self.decimation
+        if count % decimation != 0:
+            return
+
+        values = np.ravel(values)
+        if name not in self.streams:
+            self.streams[name] = LogStream(len(values), self.chunkSize)
+        stream = self.streams[name]
+        if len(values) != stream.dimension:
+            raise Exception("[DataLogger] Stream '{}' has dimension {}, got {} values".format(name, stream.dimension, len(values)))
+
+        stream.append(t, values)
+
+        if self.rotate is not None and stream.size >= self.rotate:
+            self.rotate_files()
+
+    """
+    Record the messages of topics received through transport. States are stamped with their own time,
+    inputs with the time of the state they were computed from (last element of the message) and the
+    other topics with the time of the last state received.
+    """
+    def attach(self, transport, topics=('state', 'input', 'reference', 'sensor_data')):
+        for topic in topics:
+            if topic == 'state':
+                transport.subscribe(topic, self.state_callback)
+            elif topic == 'input':
+                transport.subscribe(topic, lambda data: self.log('input', data[-1], data[0:-1]))
+            else:
+                transport.subscribe(topic, lambda data, topic=topic: self.log(topic, self.t, data))
+
+    def state_callback(self, data):
+        self.t = data[0]
+        self.log('state', data[0], data[1:])
+
+    """
+    Time (samples,) and data (samples, dimension) arrays of stream name (in memory, i.e. since the last rotation)
+    """
+    def stream(self, name):
+        if name not in self.streams:
+            raise KeyError("[DataLogger] No stream '{}', logged streams are {}".format(name, list(self.streams)))
+        return self.streams[name].arrays()
+
+    @property
+    def time(self):
+        return self.stream('state')[0]
+
+    @property
+    def stateTrajectory(self):
+        return self.stream('state')[1]
+
+    @property
+    def inputTrajectory(self):
+        return self.stream('input')[1]
+
+    def to_dataframe(self, name):
+        import pandas as pd
+        time, data = self.stream(name)
+        frame = pd.DataFrame(data, columns=['{}_{}'.format(name, i) for i in range(0, data.shape[1])])
+        frame.insert(0, 'time', time)
+        return frame
+
+    """
+    Export every stream to path: compressed .npz, or one <path>_<stream>.parquet file per stream
+    """
+    def save(self, path):
+        root, extension = os.path.splitext(path)
+        if extension == '.parquet':
+            for name in self.streams:
+                self.to_dataframe(name).to_parquet('{}_{}.parquet'.format(root, name))
+        else:
+            arrays = dict()
+            for name in self.streams:
+                arrays[name + '_time'], arrays[name] = self.stream(name)
+            np.savez_compressed(path, **arrays)
+
+    """
+    Export the streams to the next path_<k> file and release their memory
+    """
+    def rotate_files(self):
+        root, extension = os.path.splitext(self.path)
+        self.save('{}_{:04d}{}'.format(root, self.num_files, extension if extension else '.npz'))
+        self.num_files += 1
+        for stream in self.streams.values():
+            stream.clear()
+
+    def close(self):
+        if self.rotate is not None and any(stream.size > 0 for stream in self.streams.values()):
+            self.rotate_files()
@@ -2,12 +2,8 @@
 import numpy as np
 import time
 from abc import ABC, abstractmethod
-
-# ROS libraries
-import rospy
-from std_msgs.msg import Float32MultiArray
-from sensor_msgs.msg import PointCloud2
-from sensor_msgs.msg import PointField
+from .transport import ROSTransport
+from .timing import Timing, timed
 
 ## StaticController (abstract) class ##
 class StaticMap(ABC):
@@ -39,15 +35,30 @@ class StaticMap(ABC):
         self.x_dimension = kwargs['x_dimension']
         self.dt = 0
 
-        # ROS node/publisher/subscribers
-        rospy.init_node('anonymous', anonymous=True)
-        self.pt_cloud_pub = rospy.Publisher('map', PointCloud2, queue_size=10)
-        rospy.Subscriber("state", Float32MultiArray, self.state_callback)
-        rospy.Subscriber("sensor_data", Float32MultiArray, self.sensor_callback)
-        self.map_pub = rospy.Publisher('map', PointCloud2, queue_size=10)
+        # Instrumentation (None when disabled)
+        self.timing = Timing() if 'timing' in kwargs and kwargs['timing'] else None
+
+        # Transport publisher/subscribers (None runs headless)
+        self.transport = kwargs['transport'] if 'transport' in kwargs else ROSTransport()
+        if self.transport is not None:
+            self.transport.subscribe('state', timed(self.timing, 'state_callback', self.state_callback))
+            self.transport.subscribe('sensor_data', timed(self.timing, 'sensor_callback', self.sensor_callback))
 
         # Initialization
         self.x = np.zeros(self.x_dimension)
+        self.t = 0
+
+        if isinstance(self.transport, ROSTransport):
+            self.init_cloud_msg(width, height)
+
+    """
+    Point cloud message for publishing the map on ROS
+    """
+    def init_cloud_msg(self, width, height):
+        from sensor_msgs.msg import PointCloud2
+        from sensor_msgs.msg import PointField
+
+        self.map_pub = self.transport.advertise('map', PointCloud2)
 
         # Assemble single frame message
         self.cloud_msg = PointCloud2()
@@ -58,44 +69,42 @@ class StaticMap(ABC):
         self.cloud_msg.fields.append(PointField())
         self.cloud_msg.fields[0].name = 'x'
         self.cloud_msg.fields[0].offset = 0
-        self.cloud_msg.fields[0].datatype = np.dtype(np.float).itemsize 
+        self.cloud_msg.fields[0].datatype = np.dtype(np.float64).itemsize 
         self.cloud_msg.fields[0].count = self.cloud_msg.width*self.cloud_msg.height 
         # x-axis (This should be always constant)
         self.cloud_msg.fields.append(PointField())
         self.cloud_msg.fields[1].name = 'y'
-        self.cloud_msg.fields[1].offset = np.dtype(np.float).itemsize
-        self.cloud_msg.fields[1].datatype = np.dtype(np.float).itemsize 
+        self.cloud_msg.fields[1].offset = np.dtype(np.float64).itemsize
+        self.cloud_msg.fields[1].datatype = np.dtype(np.float64).itemsize 
         self.cloud_msg.fields[1].count = self.cloud_msg.width*self.cloud_msg.height 
         # Temperature (This may vary)
         self.cloud_msg.fields.append(PointField())        
         self.cloud_msg.fields[2].name = 'Temperature'
-        self.cloud_msg.fields[2].offset = np.dtype(np.float).itemsize + np.dtype(np.float).itemsize
-        self.cloud_msg.fields[2].datatype = np.dtype(np.float).itemsize 
+        self.cloud_msg.fields[2].offset = np.dtype(np.float64).itemsize + np.dtype(np.float64).itemsize
+        self.cloud_msg.fields[2].datatype = np.dtype(np.float64).itemsize 
         self.cloud_msg.fields[2].count = self.cloud_msg.width*self.cloud_msg.height                 
         
         self.cloud_msg.is_bigendian = False
-        self.cloud_msg.point_step = np.dtype(np.float).itemsize + \
-                                    np.dtype(np.float).itemsize + \
-                                    np.dtype(np.float).itemsize
+        self.cloud_msg.point_step = np.dtype(np.float64).itemsize + \
+                                    np.dtype(np.float64).itemsize + \
+                                    np.dtype(np.float64).itemsize
         self.cloud_msg.row_step = self.cloud_msg.point_step*self.cloud_msg.width 
         self.cloud_msg.is_dense = True        
 
 
-    def state_callback(self,msg):
-        self.t = msg.data[0]
-        
-        for i in range(0, self.x_dimension):
-            self.x[i] = msg.data[i+1]
+    def state_callback(self, data):
+        self.t = data[0]
+        self.x[:] = data[1:self.x_dimension+1]
 
-    def sensor_callback(self, msg):
+    def sensor_callback(self, data):
         t = self.t
         x = np.array(self.x)
-        measurement = msg.data[0]
+        measurement = data[0]
 
         self.compute_map(t, x, measurement)
 
-    def publish_map(self, timer):
+    def publish_map(self, now=None):
         self.get_map()    
 
     def run(self):
-        self.timer = rospy.Timer(rospy.Duration(.5), self.publish_map)
\ No newline at end of file
+        self.timer = self.transport.timer(.5, timed(self.timing, 'publish_map', self.publish_map, .5))
\ No newline at end of file
@@ -2,10 +2,8 @@
 import numpy as np
 import time
 from abc import ABC, abstractmethod
-
-# ROS libraries
-import rospy
-from std_msgs.msg import Float32MultiArray
+from .transport import ROSTransport
+from .timing import Timing, timed
 
 ## StaticController (abstract) class ##
 class StaticPlanner(ABC):
@@ -22,30 +20,45 @@ class StaticPlanner(ABC):
             raise KeyError("[Controller] Must specify number of states x_dimension")
 
         self.x_dimension = kwargs['x_dimension']
-        self.dt = 0
+        # Planning period, 0 plans on every state message
+        self.dt = kwargs['dt'] if 'dt' in kwargs else 0
+
+        # Instrumentation (None when disabled)
+        self.timing = Timing() if 'timing' in kwargs and kwargs['timing'] else None
 
-        # ROS node/publisher/subscribers
-        rospy.init_node('anonymous', anonymous=True)
-        self.planner_pub = rospy.Publisher('reference', Float32MultiArray, queue_size=10)
-        rospy.Subscriber("state", Float32MultiArray, self.state_callback)
+        # Transport publisher/subscribers (None runs headless)
+        self.transport = kwargs['transport'] if 'transport' in kwargs else ROSTransport()
+        if self.transport is not None:
+            self.transport.subscribe('state', timed(self.timing, 'state_callback', self.state_callback))
 
         # Initialization
         self.x = np.zeros(self.x_dimension)
+        self.t = 0
+        self.has_new_state_message = False
 
-        # Message
-        self.msg_planner = Float32MultiArray()
+        # Latest plan, also read directly by the headless Simulation
+        self.plan = None
+        self.has_new_plan = False
         
     def send_plan(self, plan): 
-        self.msg_planner.data = np.array(plan, dtype='float')
-        self.planner_pub.publish(self.msg_planner)
+        self.plan = np.array(plan, dtype='float')
+        self.has_new_plan = True
+        if self.transport is not None:
+            self.transport.publish('reference', self.plan)
 
-    def state_callback(self,msg):
-        self.t = msg.data[0]
-        
-        for i in range(0, self.x_dimension):
-            self.x[i] = msg.data[i+1]
+    def state_callback(self, data):
+        self.t = data[0]
+        self.x[:] = data[1:self.x_dimension+1]
         self.has_new_state_message = True
 
-        self.compute_input(self.t, self.x)
+        if self.dt == 0:
+            self.iterate(self.t)
+
+    def iterate(self, now=None):
+        if self.has_new_state_message:
+            self.compute_input(self.t, self.x)
+            self.has_new_state_message = False
+
     def run(self):
-        pass
\ No newline at end of file
+        if self.dt > 0:
+            self.timer = self.transport.timer(self.dt, timed(self.timing, 'iterate', self.iterate, self.dt))
\ No newline at end of file
@@ -0,0 +1,101 @@
+"""
+Summary: Headless, in-process simulation runner. The Simulation class wires a DynamicSystem with an
+optional controller, planner, sensor and map through direct function calls in a tight loop, without
+any transport, ROS master or message serialization. The components must be created with
+transport=None (plotting of the controllers should also be disabled with plot=False). To run the
+unmodified transport callbacks and timers of the components in lock step instead, create them with a
+shared LockStepTransport and call its run(simTime).
+
+Every system time step dt the runner
+- feeds the state to the planner (compute_input) every planner.dt (every step if 0) and forwards any new
+  plan to the controller
+- updates the control input every controller.dt (zero-order hold in between)
+- samples the sensor every sensor_dt and passes the measurement to the map
+- advances the system by one step
+
+and records the 'state', 'input', 'reference' and 'sensor_data' streams in a DataLogger (the kwarg
+logger, e.g. to set decimation or rotation; by default a logger preallocated for the whole run).
+
+Example:
+
+    vehicle = Unicycle(initialCondition=x_init, dt=.01, real_time=False, integrator='exact', transport=None)
+    controller = TrajectoryTracking2D(pd=pd, pdDot=pdDot, dt=.05, real_time=False, plot=False, transport=None)
+    dataLog = Simulation(system=vehicle, controller=controller, simTime=60).run()
+    plt.plot(dataLog.stateTrajectory[:,0], dataLog.stateTrajectory[:,1])
+"""
+
+import numpy as np
+from .logger import DataLogger
+
+## Simulation class ##
+class Simulation:
+
+    def __init__(self, **kwargs):
+
+        # Checking for missing parameters
+        if 'system' not in kwargs:
+            raise KeyError("[Simulation] Must specify the dynamic system")
+        if 'simTime' not in kwargs:
+            raise KeyError("[Simulation] Must specify the simulation time simTime")
+
+        self.system = kwargs['system']
+        self.simTime = kwargs['simTime']
+        self.controller = kwargs['controller'] if 'controller' in kwargs else None
+        self.planner = kwargs['planner'] if 'planner' in kwargs else None
+        self.sensor = kwargs['sensor'] if 'sensor' in kwargs else None
+        self.map = kwargs['map'] if 'map' in kwargs else None
+        self.sensor_dt = kwargs['sensor_dt'] if 'sensor_dt' in kwargs else self.system.dt
+        self.logger = kwargs['logger'] if 'logger' in kwargs else None
+
+        for component in [self.system, self.controller, self.planner, self.map]:
+            if component is not None and getattr(component, 'transport', None) is not None:
+                raise KeyError("[Simulation] Components must be created with transport=None")
+
+    """
+    Number of system steps between two executions of a component running every dt
+    """
+    def steps_per_period(self, dt):
+        return max(int(round(dt/self.system.dt)), 1)
+
+    """
+    Runs the closed loop for simTime seconds and returns the DataLogger
+    """
+    def run(self):
+        system = self.system
+        numSteps = int(round(self.simTime/system.dt))
+        log = self.logger if self.logger is not None else DataLogger(chunkSize=numSteps+1)
+
+        control_period = self.steps_per_period(self.controller.dt) if self.controller is not None else 1
+        sensor_period = self.steps_per_period(self.sensor_dt)
+        planner_period = self.steps_per_period(self.planner.dt) if self.planner is not None else 1
+        u = np.array(system.u, dtype=float)
+
+        for k in range(0, numSteps+1):
+            t = system.t
+            x = system.x
+
+            if self.planner is not None and k % planner_period == 0:
+                self.planner.compute_input(t, x[0:self.planner.x_dimension])
+                if self.planner.has_new_plan:
+                    log.log('reference', t, self.planner.plan)
+                    if self.controller is not None:
+                        self.controller.update_reference(t, self.planner.plan)
+                self.planner.has_new_plan = False
+
+            if self.controller is not None and k % control_period == 0:
+                u = self.controller.compute_input(t, x)
+
+            if self.sensor is not None and k % sensor_period == 0:
+                measurement = self.sensor.sense(t, x)
+                log.log('sensor_data', t, measurement)
+                if self.map is not None:
+                    self.map.compute_map(t, np.array(x[0:self.map.x_dimension]), measurement)
+
+            log.log('state', t, x)
+            log.log('input', t, u)
+
+            if k < numSteps:
+                system.step(u)
+
+        log.close()
+        return log
@@ -4,7 +4,16 @@ state (x) and input (u). The dimension of the state is given by the parameter x_
 and the dimension of the input by u_dimension. The evolution in time of the system is
 given by the state equation to be implemented using the abstract method stateEquation().
 
-This abstract class implements four basic functions:
+The state is propagated over each time step by the integrator selected with the kwarg
+integrator: 'ode45' (default, scipy's solve_ivp), 'euler', 'rk4' (fixed step) or 'exact',
+which uses the closed-form solution provided by the subclass in exactStep().
+
+Messages go through the transport given by the kwarg transport (a ROSTransport by default).
+With transport=None the system runs headless and is advanced with step(), e.g. by Simulation.
+With timing=True the callbacks are instrumented (see timing.py) and self.timing holds the records.
+
+This abstract class implements five basic functions:
+- step()
 - iterate()
 - publish_state()
 - input_callback()
@@ -16,12 +25,10 @@ This abstract class implements four basic functions:
 # Python libraries
 import numpy as np
 import time
-from scipy.integrate import solve_ivp as ode45
 from abc import ABC, abstractmethod
-
-# ROS libraries
-import rospy
-from std_msgs.msg import Float32MultiArray
+from .integrators import integrators
+from .transport import ROSTransport
+from .timing import Timing, timed
 
 ## DynamicSystem (abstract) class ##
 class DynamicSystem(ABC):
@@ -44,20 +51,26 @@ class DynamicSystem(ABC):
         self.x_dimension = kwargs['x_dimension']
         self.u_dimension = kwargs['u_dimension']
         self.x = kwargs['initialCondition']
+        self.integrator = kwargs['integrator'] if 'integrator' in kwargs else 'ode45'
+        if self.integrator != 'exact' and self.integrator not in integrators:
+            raise KeyError("Unknown integrator '{}', use 'exact' or one of {}".format(self.integrator, list(integrators)))
         
         # Initializing varibles
         self.u = np.zeros(self.u_dimension)
         self.t0 = 0
         self.t = 0
 
-        # ROS node/publisher/subscribers
-        rospy.init_node('anonymous', anonymous=True)
-        self.state_pub = rospy.Publisher('state', Float32MultiArray, queue_size=10)
-        rospy.Subscriber("input", Float32MultiArray, self.input_callback)
+        # Instrumentation (None when disabled)
+        self.timing = Timing() if 'timing' in kwargs and kwargs['timing'] else None
+        self.state_publish_times = dict()
+
+        # Transport publisher/subscribers (None runs headless)
+        self.transport = kwargs['transport'] if 'transport' in kwargs else ROSTransport()
+        if self.transport is not None:
+            self.transport.subscribe('input', timed(self.timing, 'input_callback', self.input_callback))
 
         # Message
-        self.msg_state = Float32MultiArray()
-        self.msg_state.data = np.zeros(self.x_dimension+1)
+        self.msg_state = np.zeros(self.x_dimension+1)
 
     """
     State equation that defines the dynamics of the system
@@ -66,47 +79,86 @@ class DynamicSystem(ABC):
     def stateEquation(self, t, x, u):
         pass
 
+    """
+    Closed-form solution of the state equation over dt for a constant input u (integrator='exact')
+    """
+    def exactStep(self, t, x, u, dt):
+        raise NotImplementedError("{} has no closed-form solution, choose another integrator".format(type(self).__name__))
+
+    """
+    State after a single time step dt starting from x at time t with constant input u
+    """
+    def integrate(self, t, x, u):
+        if self.integrator == 'exact':
+            return self.exactStep(t, x, u, self.dt)
+        return integrators[self.integrator](lambda t, x: self.stateEquation(t, x, u), t, x, self.dt)
+
+    """
+    Headless simulation: apply input u (keep the last one if None) and advance by a single time step
+    """
+    def step(self, u=None):
+        if u is not None:
+            self.u = u
+        self.x = self.integrate(self.t, self.x, self.u)
+        self.t += self.dt
+        return self.x
+
     """
     Iterate the system dynamics forward in time by a single time step.
+    now - current time in seconds given by the transport timer
     """
-    def iterate(self, timer):
+    def iterate(self, now=None):
+        if self.transport.lock_step:
+            # Advance exactly from the previous tick, so the published state is stamped with its own time
+            self.x = self.integrate(self.t, self.x, self.u)
+            self.t = now - self.t0
+            self.publish_state()
+            return
         if self.real_time:
-            self.t = timer.current_real.to_sec() - self.t0 
+            self.t = now - self.t0
         # Iterating the state of the vehicle
-        ode_fun = lambda t, x: self.stateEquation(t, self.x, self.u)
-        sol = ode45(ode_fun, [0, self.dt], self.x)
-        self.x = sol.y[:,-1]        
-        self.publish_state(rospy.Time.from_sec(0))
+        self.x = self.integrate(self.t, self.x, self.u)
+        self.publish_state()
 
     """
-    Publishes the current state on ROS
+    Publishes the current state on the transport
     """
-    def publish_state(self, timer):
+    def publish_state(self, now=None):
         # Assemble and send message
-        self.msg_state.data[0] = self.t
-        for i in range(0, self.x_dimension):
-            self.msg_state.data[i+1] = self.x[i]
-        self.state_pub.publish(self.msg_state)       
+        self.msg_state[0] = self.t
+        self.msg_state[1:] = np.ravel(self.x)
+        self.transport.publish('state', self.msg_state)
+
+        if self.timing is not None:
+            # Publication time of the last states, to match the time stamp echoed in the input message
+            self.state_publish_times[self.t] = time.perf_counter()
+            if len(self.state_publish_times) > 64:
+                del self.state_publish_times[next(iter(self.state_publish_times))]
     
     """
-    Receives via ROS the input of the system
+    Receives via the transport the input of the system
     """
-    def input_callback(self, msg):
-        for i in range(0, self.u_dimension):
-            self.u[i] = msg.data[i]
-        
-        if not self.real_time:
+    def input_callback(self, data):
+        self.u[...] = np.reshape(data[0:self.u_dimension], np.shape(self.u))
+
+        if self.timing is not None and len(data) > self.u_dimension:
+            published = self.state_publish_times.get(data[self.u_dimension])
+            if published is not None:
+                self.timing.record('state_to_input', time.perf_counter() - published)
+
+        if not self.real_time and not self.transport.lock_step:
             self.t += self.dt
-            self.iterate(rospy.Time.from_sec(self.t))
+            self.iterate(self.t)
 
     """
     Runs simulation in an infinite loop
     real_time == TRUE: call the iterate function based on time step
-    real_time == FALSE: call the iterate function as soon as receives an input
+    real_time == FALSE: call the iterate function as soon as receives an input, or every time step of the
+    simulated clock of a lock-step transport
     """
     def run(self):
-        if self.real_time:
-            self.t0 = rospy.Time.now().to_sec()
-            self.timer = rospy.Timer(rospy.Duration(self.dt), self.iterate)
+        if self.real_time or self.transport.lock_step:
+            self.t0 = self.transport.now()
+            self.timer = self.transport.timer(self.dt, timed(self.timing, 'iterate', self.iterate, self.dt))
         else:
-            self.timer = rospy.Timer(rospy.Duration(1), self.iterate)
+            self.timer = self.transport.timer(1, timed(self.timing, 'iterate', self.iterate))
@@ -0,0 +1,104 @@
+"""
+Summary: Timing instrumentation of the core components in real-time mode. A Timing object keeps named
+streams of samples (seconds) in fixed-size ring buffers, so memory stays bounded however long a node
+runs, and summarizes them with percentiles. Components create one when built with timing=True and
+expose it as component.timing (None when disabled, in which case the plain callbacks are registered
+and nothing is measured).
+
+Recorded streams:
+- <callback>: execution time of every transport callback (iterate, state_callback, input_callback, ...)
+- <callback>_jitter: actual period minus nominal period of the timer callbacks
+- state_age (StaticController): time from the reception of a state to the compute_input that uses it
+- state_to_input (DynamicSystem): time from publishing a state to receiving the input computed from it,
+  matched through the state time stamp the controller appends to the input message
+
+Example:
+
+    vehicle = Unicycle(initialCondition=x_init, dt=.01, real_time=True, timing=True)
+    ...
+    print(vehicle.timing.report())
+"""
+
+import time
+import numpy as np
+
+## Fixed-size ring buffer of float samples ##
+class RingBuffer:
+
+    def __init__(self, size):
+        self.data = np.zeros(size)
+        self.count = 0
+
+    def append(self, value):
+        self.data[self.count % len(self.data)] = value
+        self.count += 1
+
+    """
+    Samples currently held (the last len(data) ones, not in chronological order once wrapped)
+    """
+    def values(self):
+        return self.data[0:min(self.count, len(self.data))]
+
+## Timing class ##
+class Timing:
+
+    def __init__(self, **kwargs):
+        self.size = kwargs['size'] if 'size' in kwargs else 1024
+        self.buffers = dict()
+
+    def record(self, name, value):
+        if name not in self.buffers:
+            self.buffers[name] = RingBuffer(self.size)
+        self.buffers[name].append(value)
+
+    """
+    Wrap callback so that its execution time is recorded as name and, for a timer of the given period,
+    the deviation of the actual period from it as name_jitter
+    """
+    def timed(self, name, callback, period=None):
+        jitter = name + '_jitter'
+        last_start = [None]
+
+        def timed_callback(*args):
+            start = time.perf_counter()
+            if period is not None and last_start[0] is not None:
+                self.record(jitter, start - last_start[0] - period)
+            last_start[0] = start
+            result = callback(*args)
+            self.record(name, time.perf_counter() - start)
+            return result
+
+        return timed_callback
+
+    """
+    Percentile summary of every stream: {name: {'count', 'mean', 'p<q>' for q in percentiles}}.
+    count is the total number of samples, the statistics cover the ones still in the ring buffer.
+    """
+    def summary(self, percentiles=(50, 90, 99, 100)):
+        summary = dict()
+        for name, buffer in self.buffers.items():
+            values = buffer.values()
+            stats = {'count': buffer.count, 'mean': np.mean(values)}
+            for q, value in zip(percentiles, np.percentile(values, percentiles)):
+                stats['p{:g}'.format(q)] = value
+            summary[name] = stats
+        return summary
+
+    """
+    Summary as a text table in milliseconds
+    """
+    def report(self, percentiles=(50, 90, 99, 100)):
+        header = ['p{:g}'.format(q) for q in percentiles]
+        lines = ['{:>24}{:>10}{:>10}'.format('[ms]', 'count', 'mean') + ''.join('{:>10}'.format(h) for h in header)]
+        for name, stats in self.summary(percentiles).items():
+            lines.append('{:>24}{:>10d}{:>10.3f}'.format(name, stats['count'], 1e3*stats['mean']) +
+                         ''.join('{:>10.3f}'.format(1e3*stats[h]) for h in header))
+        return '\n'.join(lines)
+
+"""
+callback wrapped by timing.timed(), or callback itself when timing is None (instrumentation disabled)
+"""
+def timed(timing, name, callback, period=None):
+    if timing is None:
+        return callback
+    return timing.timed(name, callback, period)
@@ -0,0 +1,429 @@
+"""
+Summary: Transports carry the messages exchanged by pyArena components (state, input, reference,
+sensor_data, ...) and provide the timers that drive them. Components only talk to the abstract
+Transport interface, so the same DynamicSystem/StaticController/StaticPlanner/StaticMap can run as
+ROS nodes, or without any transport (transport=None) inside the headless Simulation runner.
+
+Messages are 1D float64 numpy arrays. Subscriber callbacks receive the message data and timer
+callbacks receive the current time in seconds. The data handed to a callback may be a read-only view
+on the transport's receive buffer, so components copy what they keep into their own preallocated
+arrays (slice assignment) instead of holding a reference.
+
+- ROSTransport: ROS topics and timers (rospy is only imported when this transport is created).
+  Arrays travel as Float64MultiArray through rospy.numpy_msg, i.e. the whole buffer is written with a
+  single tobytes() on publish and received as an np.frombuffer view, with no per-element packing.
+- SharedMemoryTransport: lock-free ring buffers in multiprocessing.shared_memory for nodes running
+  on the same host, without a ROS master or sockets.
+- AsyncioTransport: many components in one process as coroutines of a single asyncio event loop, with
+  a queue per subscription and drift-free timers (no callback threads, no shared-field contention).
+- LockStepTransport: in-process discrete-event scheduler on a simulated clock. Every component runs
+  from its own timer at its own dt, in a deterministic order and as fast as possible.
+
+A node process drives its subscriptions and timers with transport.spin().
+"""
+
+import time
+import heapq
+import numpy as np
+from abc import ABC, abstractmethod
+
+# Names of the shared memory blocks created (and registered with the resource tracker) by this process
+_owned_blocks = set()
+
+## Transport (abstract) class ##
+class Transport(ABC):
+
+    # True when the transport drives every component from its own timers on a simulated clock. Components
+    # in real_time=False mode then run at their dt rate instead of stepping on each received message.
+    lock_step = False
+
+    """
+    Publish data (1D numpy array) on topic
+    """
+    @abstractmethod
+    def publish(self, topic, data):
+        pass
+
+    """
+    Call callback(data) for every message received on topic
+    """
+    @abstractmethod
+    def subscribe(self, topic, callback):
+        pass
+
+    """
+    Call callback(now) every period seconds
+    """
+    @abstractmethod
+    def timer(self, period, callback):
+        pass
+
+    """
+    Current time in seconds
+    """
+    @abstractmethod
+    def now(self):
+        pass
+
+    """
+    Process callbacks until the node is shut down
+    """
+    def spin(self):
+        raise NotImplementedError("{} cannot spin".format(type(self).__name__))
+
+
+## ROS adapter ##
+class ROSTransport(Transport):
+
+    def __init__(self, **kwargs):
+        # ROS libraries
+        import rospy
+        from rospy.numpy_msg import numpy_msg
+        from std_msgs.msg import Float64MultiArray
+
+        self.rospy = rospy
+        self.msg_type = numpy_msg(Float64MultiArray)
+
+        rospy.init_node('anonymous', anonymous=True)
+        self.publishers = dict()
+        self.messages = dict()
+
+    def advertise(self, topic, msg_type=None, queue_size=10):
+        msg_type = self.msg_type if msg_type is None else msg_type
+        self.publishers[topic] = self.rospy.Publisher(topic, msg_type, queue_size=queue_size)
+        self.messages[topic] = msg_type()
+        return self.publishers[topic]
+
+    def publish(self, topic, data):
+        if topic not in self.publishers:
+            self.advertise(topic)
+        msg = self.messages[topic]
+        msg.data = data
+        self.publishers[topic].publish(msg)
+
+    def subscribe(self, topic, callback, msg_type=None):
+        msg_type = self.msg_type if msg_type is None else msg_type
+        return self.rospy.Subscriber(topic, msg_type, lambda msg: callback(msg.data))
+
+    def timer(self, period, callback):
+        return self.rospy.Timer(self.rospy.Duration(period), lambda event: callback(event.current_real.to_sec()))
+
+    def now(self):
+        return self.rospy.Time.now().to_sec()
+
+    def spin(self):
+        self.rospy.spin()
+
+
+## Shared memory adapter ##
+class SharedMemoryTransport(Transport):
+
+    """
+    Every topic is a ring buffer of slots messages of at most maxSize float64 elements, kept in the shared
+    memory block '<namespace>_<topic>'. The block is created by the first node that publishes or
+    subscribes to the topic, so all nodes must use the same namespace, slots and maxSize.
+
+    Block layout (8 byte words): [count | seq[slots] | length[slots] | data[slots, maxSize]]
+    - count: number of messages published on the topic so far
+    - seq[k]: seqlock of slot k, odd while message n = seq//2 is being written and 2n+2 once it is complete
+    - length[k]: number of elements of the message in slot k
+
+    There is a single publisher per topic (as for every pyArena stream). A reader validates a message by
+    checking that the seqlock of its slot is 2n+2 before and after copying it; messages overwritten by a
+    publisher that laps the reader are dropped, the reader then jumps to the oldest message still in the
+    ring. Subscriptions and timers are served by spin() (busy polling, sleeping pollInterval seconds
+    between rounds), so callbacks run in the node's main thread only.
+    """
+    def __init__(self, **kwargs):
+        from multiprocessing import shared_memory
+
+        self.shared_memory = shared_memory
+        self.namespace = kwargs['namespace'] if 'namespace' in kwargs else 'pyarena'
+        self.slots = int(kwargs['slots']) if 'slots' in kwargs else 16
+        self.maxSize = int(kwargs['maxSize']) if 'maxSize' in kwargs else 64
+        self.pollInterval = kwargs['pollInterval'] if 'pollInterval' in kwargs else 0.
+
+        self.rings = dict()
+        self.subscriptions = []
+        self.timers = []
+        self.is_shutdown = False
+
+    """
+    Create (or attach to) the ring buffer of topic and return its numpy views
+    """
+    def ring(self, topic):
+        if topic in self.rings:
+            return self.rings[topic]
+
+        name = '{}_{}'.format(self.namespace, topic.strip('/').replace('/', '_'))
+        size = 8*(1 + 2*self.slots + self.slots*self.maxSize)
+        try:
+            block = self.shared_memory.SharedMemory(name=name, create=True, size=size)
+            owner = True
+            _owned_blocks.add(name)
+        except FileExistsError:
+            block = self.shared_memory.SharedMemory(name=name)
+            owner = False
+            # Only the creator unlinks the block, keep the resource tracker of this process away from it
+            if name not in _owned_blocks:
+                from multiprocessing import resource_tracker
+                resource_tracker.unregister(block._name, 'shared_memory')
+            if block.size < size:
+                block.close()
+                raise Exception("[SharedMemoryTransport] Topic '{}' was created with a different slots/maxSize".format(topic))
+
+        ring = {'block': block, 'owner': owner, 'name': name,
+                'count': np.ndarray((1,), dtype=np.int64, buffer=block.buf),
+                'seq': np.ndarray((self.slots,), dtype=np.int64, buffer=block.buf, offset=8),
+                'length': np.ndarray((self.slots,), dtype=np.int64, buffer=block.buf, offset=8*(1 + self.slots)),
+                'data': np.ndarray((self.slots, self.maxSize), dtype=np.float64, buffer=block.buf, offset=8*(1 + 2*self.slots))}
+        self.rings[topic] = ring
+        return ring
+
+    def publish(self, topic, data):
+        ring = self.ring(topic)
+        data = np.ravel(data)
+        if len(data) > self.maxSize:
+            raise Exception("[SharedMemoryTransport] Message on '{}' has {} elements, maxSize is {}".format(topic, len(data), self.maxSize))
+
+        n = int(ring['count'][0])
+        k = n % self.slots
+        ring['seq'][k] = 2*n + 1
+        ring['length'][k] = len(data)
+        ring['data'][k, 0:len(data)] = data
+        ring['seq'][k] = 2*n + 2
+        ring['count'][0] = n + 1
+
+    """
+    Subscribers only receive the messages published after they subscribed
+    """
+    def subscribe(self, topic, callback):
+        ring = self.ring(topic)
+        subscription = {'ring': ring, 'callback': callback, 'next': int(ring['count'][0]),
+                        'buffer': np.zeros(self.maxSize), 'dropped': 0}
+        self.subscriptions.append(subscription)
+        return subscription
+
+    def timer(self, period, callback):
+        timer = {'period': period, 'deadline': self.now() + period, 'callback': callback}
+        self.timers.append(timer)
+        return timer
+
+    def now(self):
+        return time.monotonic()
+
+    """
+    Deliver the messages received by subscription since the last poll
+    """
+    def poll(self, subscription):
+        ring = subscription['ring']
+        count = int(ring['count'][0])
+        if count - subscription['next'] > self.slots:
+            subscription['dropped'] += count - self.slots - subscription['next']
+            subscription['next'] = count - self.slots
+
+        buffer = subscription['buffer']
+        while subscription['next'] < count:
+            n = subscription['next']
+            subscription['next'] += 1
+            k = n % self.slots
+
+            seq = ring['seq'][k]
+            if seq != 2*n + 2:
+                subscription['dropped'] += 1
+                continue
+            length = int(ring['length'][k])
+            buffer[0:length] = ring['data'][k, 0:length]
+            if ring['seq'][k] != seq:
+                subscription['dropped'] += 1
+                continue
+
+            data = buffer[0:length]
+            data.flags.writeable = False
+            subscription['callback'](data)
+
+    """
+    One round of the event loop: deliver pending messages and fire the timers that are due
+    """
+    def spin_once(self):
+        for subscription in self.subscriptions:
+            self.poll(subscription)
+
+        now = self.now()
+        for timer in self.timers:
+            if now >= timer['deadline']:
+                # Skip missed periods instead of firing a burst of callbacks
+                timer['deadline'] += timer['period']
+                if timer['deadline'] <= now:
+                    timer['deadline'] = now + timer['period']
+                timer['callback'](now)
+
+    def spin(self):
+        try:
+            while not self.is_shutdown:
+                self.spin_once()
+                time.sleep(self.pollInterval)
+        finally:
+            self.close()
+
+    def shutdown(self):
+        self.is_shutdown = True
+
+    """
+    Release the shared memory blocks, unlinking the ones created by this node
+    """
+    def close(self):
+        for ring in self.rings.values():
+            for view in ['count', 'seq', 'length', 'data']:
+                ring[view] = None
+            ring['block'].close()
+            if ring['owner']:
+                ring['block'].unlink()
+                _owned_blocks.discard(ring['name'])
+        self.rings = dict()
+        self.subscriptions = []
+
+
+## Asyncio adapter ##
+class AsyncioTransport(Transport):
+
+    """
+    All the components sharing this transport run in the thread that calls spin(). Each subscription owns
+    a bounded asyncio.Queue (queueSize messages, the oldest is dropped when full, like a ROS queue_size)
+    drained by its own coroutine, and each timer is a coroutine sleeping until its next absolute deadline,
+    so periods do not accumulate drift. Published arrays are copied into the queues because publishers
+    reuse their message buffers. publish() must be called from the event loop thread.
+    """
+    def __init__(self, **kwargs):
+        import asyncio
+
+        self.asyncio = asyncio
+        self.loop = kwargs['loop'] if 'loop' in kwargs else asyncio.new_event_loop()
+        self.queueSize = kwargs['queueSize'] if 'queueSize' in kwargs else 10
+
+        self.queues = dict()
+        self.tasks = []
+
+    def publish(self, topic, data):
+        data = np.array(data, dtype=float)
+        data.flags.writeable = False
+        for queue in self.queues.get(topic, []):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(data)
+
+    def subscribe(self, topic, callback):
+        queue = self.asyncio.Queue(maxsize=self.queueSize)
+        self.queues.setdefault(topic, []).append(queue)
+        self.tasks.append(self.loop.create_task(self.consume(queue, callback)))
+        return queue
+
+    async def consume(self, queue, callback):
+        while True:
+            data = await queue.get()
+            try:
+                callback(data)
+            except Exception as exception:
+                # Report and keep the subscription alive, as a ROS subscriber does
+                self.loop.call_exception_handler({'message': 'Exception in subscriber callback', 'exception': exception})
+
+    def timer(self, period, callback):
+        task = self.loop.create_task(self.tick(period, callback))
+        self.tasks.append(task)
+        return task
+
+    async def tick(self, period, callback):
+        deadline = self.loop.time() + period
+        while True:
+            await self.asyncio.sleep(deadline - self.loop.time())
+            try:
+                callback(self.now())
+            except Exception as exception:
+                self.loop.call_exception_handler({'message': 'Exception in timer callback', 'exception': exception})
+            deadline += period
+            # Skip missed periods instead of firing a burst of callbacks
+            if deadline < self.loop.time():
+                deadline = self.loop.time() + period
+
+    def now(self):
+        return self.loop.time()
+
+    def spin(self):
+        try:
+            self.loop.run_forever()
+        finally:
+            self.close()
+
+    def shutdown(self):
+        self.loop.stop()
+
+    def close(self):
+        for task in self.tasks:
+            task.cancel()
+        if self.tasks:
+            self.loop.run_until_complete(self.asyncio.gather(*self.tasks, return_exceptions=True))
+        self.tasks = []
+        self.loop.close()
+
+
+## Discrete-event (lock-step) adapter ##
+class LockStepTransport(Transport):
+
+    """
+    Simulated time is an integer number of ticks of length resolution, so timers with different periods
+    (e.g. 100 Hz dynamics, 20 Hz control, 1 Hz planning) fire exactly together without floating point drift.
+    Pending timer events are kept in a heap ordered by (tick, creation order): events due at the same tick
+    run in the order the timers were created, i.e. the order of the run() calls of the components.
+    Messages are delivered synchronously to the subscribers of the topic, in subscription order.
+    """
+    lock_step = True
+
+    def __init__(self, **kwargs):
+        self.resolution = kwargs['resolution'] if 'resolution' in kwargs else 1e-6
+        self.tick = 0
+        self.events = []
+        self.num_timers = 0
+        self.subscribers = dict()
+        self.is_shutdown = False
+
+    def publish(self, topic, data):
+        data = np.asarray(data).view()
+        data.flags.writeable = False
+        for callback in self.subscribers.get(topic, []):
+            callback(data)
+
+    def subscribe(self, topic, callback):
+        self.subscribers.setdefault(topic, []).append(callback)
+        return callback
+
+    def timer(self, period, callback):
+        ticks = int(round(period/self.resolution))
+        if ticks < 1:
+            raise Exception("[LockStepTransport] Timer period {} is below the resolution {}".format(period, self.resolution))
+        self.num_timers += 1
+        timer = {'period': ticks, 'callback': callback}
+        heapq.heappush(self.events, (self.tick + ticks, self.num_timers, timer))
+        return timer
+
+    def now(self):
+        return self.tick*self.resolution
+
+    """
+    Advance the simulated clock up to time until, running every timer event due on the way
+    """
+    def run(self, until):
+        last = int(round(until/self.resolution))
+        while self.events and self.events[0][0] <= last and not self.is_shutdown:
+            tick, order, timer = heapq.heappop(self.events)
+            self.tick = tick
+            heapq.heappush(self.events, (tick + timer['period'], order, timer))
+            timer['callback'](self.now())
+        if not self.is_shutdown:
+            self.tick = max(self.tick, last)
+
+    def spin(self):
+        while self.events and not self.is_shutdown:
+            self.run(self.now() + 1.)
+
+    def shutdown(self):
+        self.is_shutdown = True
@@ -1,3 +1,7 @@
+import os
+import json
+import hashlib
+import tempfile
 import pandas as pd
 import numpy as np
 import seaborn as sns
@@ -6,13 +10,19 @@ import matplotlib.pyplot as plt
 # Careful about disabling the warning, may not be a problem in this specific case
 pd.set_option('mode.chained_assignment', None)
 
+# Format of the preprocessed readings in the cache, bump when it changes
+_CACHE_VERSION = 1
+
+# Time steps resampled at a time when preprocessing the data file
+_BLOCK_SIZE = 4096
+
 
 class IntelBerkeley:
 
     def __init__(self, **kwargs):
 
         if 'path' in kwargs:
-            self.path = kwargs['location']
+            self.path = kwargs['path']
         else:
             self.path = '/home/romulo/Documents/dataset'
 
@@ -21,6 +31,7 @@ class IntelBerkeley:
         else:
             self.dt = 60
 
+        # Simulated time span (seconds), None plays the whole date range
         if 'T_sim' in kwargs:
             self.T_sim = kwargs['T_sim']
         else:
@@ -36,13 +47,35 @@ class IntelBerkeley:
         else:
             self.grid_resolution = .25
 
+        # Number of nearest sensors used by the interpolation of each grid cell (None uses all of them)
+        if 'num_neighbours' in kwargs:
+            self.num_neighbours = kwargs['num_neighbours']
+        else:
+            self.num_neighbours = None
+
         # Path to sensor data and location
         sensor_data_path = self.path + '/IntelBerkeley.txt'
         sensor_position_path = self.path + '/mote_locs.txt'
         
-        # Retrieving labeled data
-        column_names = ['Date', 'Time', 'Epoch', 'ID', 'Temperature', 'Humidity', 'Light', 'Voltage']
-        full_sensor_data = pd.read_table(sensor_data_path, sep=' ', names=column_names)
+        # Directory of the preprocessed readings (None disables the cache)
+        if 'cache_dir' in kwargs:
+            self.cache_dir = kwargs['cache_dir']
+        else:
+            self.cache_dir = self.path + '/cache'
+
+        # Recorded days to play back: [start date, end date), None leaves a side open ((None, None) is the
+        # whole dataset)
+        if 'date_range' in kwargs:
+            self.date_range = kwargs['date_range']
+        else:
+            self.date_range = ('2004-02-28', '2004-02-29')
+
+        # Lines of the data file parsed at a time
+        if 'chunk_size' in kwargs:
+            self.chunk_size = kwargs['chunk_size']
+        else:
+            self.chunk_size = 1000000
+
         self.sensor_position_data = pd.read_table(sensor_position_path, sep=' ', names=['ID', 'x', 'y'])
 
         # Sensor location limits
@@ -64,64 +97,250 @@ class IntelBerkeley:
 
         self.stacked_positions = np.stack((X, Y), axis=-1)
         self.num_stacked_positions = len(self.stacked_positions)
+        self.grid_shape = gridX.shape   # (num x cells, num y cells), stacked_positions is x major
 
-        # For now extract only one day data
-        onedaydata = full_sensor_data[ full_sensor_data['Date'] < '2004-02-29'  ]
-        onedaydata = onedaydata[ onedaydata['Date'] >= '2004-02-28'  ]
+        # Interpolation weights of every grid cell, they only depend on the geometry
+        self.interpolation_weights = self.interpolation_matrix(self.stacked_positions, self.base_position, self.num_neighbours)
 
         self.num_sensors = len(self.sensor_position_data)
+        self.channels = ['Temperature', 'Humidity', 'Light', 'Voltage']
 
-        self.sensorData = list()
-        start_time_list = list()
+        # Resampled readings on a dt grid starting at origin: readings[k] holds the readings of all the
+        # sensors at time origin + k*dt (sets start_time and origin)
+        self.readings = self.load_readings(sensor_data_path)
 
-        for sensorID_index in range(self.num_sensors):
-            # Extract individual sensor data
-            temp_dataframe = onedaydata[onedaydata['ID'] == (sensorID_index + 1)]
+        # Compute end time for simulation of recorded data
+        self.start_offset = (self.start_time - self.origin).total_seconds()
+        if self.T_sim is None:
+            self.T_sim = len(self.readings)*self.dt - self.start_offset
+        self.end_time = self.start_time + pd.DateOffset(seconds=self.T_sim)
 
-            # Rename index with time stamps - useful for interpolation
-            temp_dataframe.rename(index=pd.to_datetime(temp_dataframe.loc[:, 'Time']), inplace=True)
+        num_timesteps = int(np.ceil((self.end_time - self.origin).total_seconds() / self.dt))
+        self.readings = self.readings[0:num_timesteps]
+        self.num_timesteps = len(self.readings)
 
-            # Sort the index to replicate increasing time stamps
-            temp_dataframe = temp_dataframe.sort_index()
-  
-            start_time_list.append(temp_dataframe.index.min())
+        print('Done!!')
 
-            # Append to list of individual sensor data
-            self.sensorData.append(temp_dataframe)
-            print("Sensor ID {}: Number of readings {}".format(sensorID_index + 1, len(temp_dataframe)))
+    # End of __init__() of class IntelBerkeley
 
-        # Compute start time and end time for simulation of recorded data
-        self.start_time = min(start_time_list)
-        start_time_index = start_time_list.index(self.start_time)
+    """
+    Resampled readings of the data file, memory-mapped from the cache when the file (same content) was
+    already preprocessed with the same dt and date range, otherwise parsed and written to the cache.
+    Cache entries are <key>.npy (readings) and <key>.json (time stamps), the json being written last.
+    return - num_bins x num_sensors x num_channels numpy array (read only when memory-mapped)
+    """
+    def load_readings(self, sensor_data_path):
+
+        if self.cache_dir is None:
+            return self.preprocess(sensor_data_path)
+
+        parameters = [self.file_hash(sensor_data_path), self.dt, list(self.date_range), self.num_sensors, _CACHE_VERSION]
+        key = hashlib.sha1(json.dumps(parameters).encode()).hexdigest()
+        cache_path = os.path.join(self.cache_dir, key)
+
+        if not os.path.exists(cache_path + '.json'):
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                readings = self.preprocess(sensor_data_path, cache_path + '.tmp.npy')
+                readings.flush()
+                del readings
+                os.replace(cache_path + '.tmp.npy', cache_path + '.npy')
+                with open(cache_path + '.json', 'w') as f:
+                    json.dump({'start_time': str(self.start_time), 'origin': str(self.origin),
+                               'parameters': parameters}, f)
+            except OSError as error:
+                print('[IntelBerkeley] Could not write the cache in {}: {}'.format(self.cache_dir, error))
+                return self.preprocess(sensor_data_path)
+
+        with open(cache_path + '.json') as f:
+            metadata = json.load(f)
+        self.start_time = pd.Timestamp(metadata['start_time'])
+        self.origin = pd.Timestamp(metadata['origin'])
+
+        return np.load(cache_path + '.npy', mmap_mode='r')
+
+    # End of load_readings
 
-        self.end_time = self.start_time + pd.DateOffset(seconds=self.T_sim)
+    """
+    SHA-1 of the content of a file. Hashes are remembered in the cache directory by path, size and
+    modification time, so an unchanged file is only read once.
+    """
+    def file_hash(self, file_path):
 
-        # Add the start time to all the sensor data and resample with given dt
-        print('Resampling, Interpolation and Truncation!')
-        for sensor_index in range(self.num_sensors):
-            if sensor_index != start_time_index:
-                self.sensorData[sensor_index].loc[self.start_time] = np.nan
+        stat = os.stat(file_path)
+        stamp = [os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns]
+        hashes_path = os.path.join(self.cache_dir, 'hashes.json')
 
-            # Resample
-            self.sensorData[sensor_index] = self.sensorData[sensor_index] \
-                .resample(str(self.dt) + 'S').mean()
+        hashes = dict()
+        if os.path.exists(hashes_path):
+            with open(hashes_path) as f:
+                hashes = json.load(f)
+        if stamp[0] in hashes and hashes[stamp[0]][0:2] == stamp[1:]:
+            return hashes[stamp[0]][2]
 
-            # Interpolate
-            self.sensorData[sensor_index] = self.sensorData[sensor_index] \
-                .interpolate(method='linear', limit_direction='both')
+        sha1 = hashlib.sha1()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 24), b''):
+                sha1.update(block)
 
-            self.sensorData[sensor_index] = self.sensorData[sensor_index] \
-                .loc[self.sensorData[sensor_index].index < self.end_time]
-            # Filling missing data [why?]
-            self.sensorData[sensor_index] = self.sensorData[sensor_index].fillna(value=0.0)
+        hashes[stamp[0]] = stamp[1:] + [sha1.hexdigest()]
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(hashes_path, 'w') as f:
+                json.dump(hashes, f)
+        except OSError:
+            pass
 
-        print('Done!!')
+        return sha1.hexdigest()
 
-    # End of __init__() of class IntelBerkeley
+    # End of file_hash
+
+    """
+    Parsed lines of the data file in the date range from the known motes, chunk_size lines at a time
+    columns - columns to parse (ID and Date are always parsed)
+    yield - (time stamps pandas Series of 'Date Time' strings, sensor IDs numpy array, DataFrame of the lines)
+    """
+    def read_chunks(self, sensor_data_path, columns):
+
+        column_names = ['Date', 'Time', 'Epoch', 'ID', 'Temperature', 'Humidity', 'Light', 'Voltage']
+        reader = pd.read_table(sensor_data_path, sep=' ', names=column_names, chunksize=self.chunk_size,
+                               usecols=sorted(set(columns) | {'Date', 'Time', 'ID'}, key=column_names.index))
+
+        for data in reader:
+            if self.date_range[0] is not None:
+                data = data[data['Date'] >= self.date_range[0]]
+            if self.date_range[1] is not None:
+                data = data[data['Date'] < self.date_range[1]]
+            data = data[(data['ID'] >= 1) & (data['ID'] <= self.num_sensors)]
+
+            if len(data) > 0:
+                yield data['Date'] + ' ' + data['Time'], data['ID'].to_numpy(dtype=int), data
+
+    # End of read_chunks
+
+    """
+    Stream the data file and resample the readings of the date range on a dt grid from origin: the
+    readings falling in each dt bin of every sensor are averaged and the empty bins are filled by linear
+    interpolation in time (constant before the first and after the last reading, 0 for sensors without
+    readings). Sets start_time and origin.
+    The file is read twice (time span, then readings) chunk_size lines at a time, and the bins are
+    accumulated and interpolated in blocks of _BLOCK_SIZE time steps directly into out_path, so memory
+    does not grow with the date range. The file does not need to be sorted by time.
+    out_path - .npy file receiving the readings (memory-mapped), None writes them to a temporary file
+    return - num_bins x num_sensors x num_channels numpy array
+    """
+    def preprocess(self, sensor_data_path, out_path=None):
+
+        # Time span (ISO time stamps sort as strings) and number of readings of each sensor
+        first_time, last_time = None, None
+        num_readings = np.zeros(self.num_sensors, dtype=int)
+        for timestamps, ids, data in self.read_chunks(sensor_data_path, []):
+            first_time = timestamps.min() if first_time is None else min(first_time, timestamps.min())
+            last_time = timestamps.max() if last_time is None else max(last_time, timestamps.max())
+            num_readings += np.bincount(ids - 1, minlength=self.num_sensors)
+
+        if first_time is None:
+            raise Exception("[IntelBerkeley] No readings in the date range {}".format(self.date_range))
+
+        for sensorID_index, count in enumerate(num_readings):
+            print("Sensor ID {}: Number of readings {}".format(sensorID_index + 1, count))
+
+        # Compute start time for simulation of recorded data
+        self.start_time = pd.to_datetime(first_time)
+
+        self.origin = self.start_time.floor(str(self.dt) + 's')
+        num_bins = (pd.to_datetime(last_time) - self.origin) // pd.Timedelta(seconds=self.dt) + 1
+        shape = (num_bins, self.num_sensors, len(self.channels))
+
+        # Sums, then means, of the readings of every bin, next to their counts
+        # (temporary files without out_path, so memory does not depend on the date range either)
+        if out_path is None:
+            readings = np.memmap(tempfile.TemporaryFile(), mode='w+', dtype=np.float64, shape=shape)
+            counts = np.memmap(tempfile.TemporaryFile(), mode='w+', dtype=np.int32, shape=shape)
+        else:
+            readings = np.lib.format.open_memmap(out_path, mode='w+', dtype=np.float64, shape=shape)
+            counts = np.memmap(tempfile.TemporaryFile(dir=os.path.dirname(out_path)), mode='w+', dtype=np.int32, shape=shape)
+
+        for timestamps, ids, data in self.read_chunks(sensor_data_path, self.channels):
+            bins = ((pd.to_datetime(timestamps) - self.origin) // pd.Timedelta(seconds=self.dt)).to_numpy(dtype=int)
+            values = data.loc[:, self.channels].to_numpy(dtype=float)
+
+            # Accumulate the chunk one block of time steps at a time
+            order = np.argsort(bins, kind='stable')
+            bins, ids, values = bins[order], ids[order], values[order]
+            for lo in range(bins[0] - bins[0] % _BLOCK_SIZE, bins[-1] + 1, _BLOCK_SIZE):
+                hi = min(lo + _BLOCK_SIZE, num_bins)
+                rows = slice(*np.searchsorted(bins, [lo, hi]))
+                cells = (bins[rows] - lo)*self.num_sensors + (ids[rows] - 1)
+                for channel in range(len(self.channels)):
+                    valid = ~np.isnan(values[rows, channel])
+                    size = (hi - lo)*self.num_sensors
+                    readings[lo:hi, :, channel] += np.bincount(cells[valid], weights=values[rows, channel][valid], minlength=size).reshape(hi - lo, -1)
+                    counts[lo:hi, :, channel] += np.bincount(cells[valid], minlength=size).reshape(hi - lo, -1)
+
+        # Means and interpolation along time of every sensor and channel (columns), block by block: the
+        # last known bin of every column is carried over to the next block
+        readings_columns = readings.reshape(num_bins, -1)
+        counts_columns = counts.reshape(num_bins, -1)
+        last_bin = np.full(readings_columns.shape[1], -1)
+        last_value = np.zeros(readings_columns.shape[1])
+
+        for lo in range(0, num_bins, _BLOCK_SIZE):
+            hi = min(lo + _BLOCK_SIZE, num_bins)
+            known = counts_columns[lo:hi] > 0
+            with np.errstate(invalid='ignore', divide='ignore'):
+                block = readings_columns[lo:hi] / counts_columns[lo:hi]
+
+            # Previous and next known bin of every entry (next = num_bins when not in this block)
+            steps = np.arange(lo, hi)[:, np.newaxis]
+            previous = np.maximum.accumulate(np.where(known, steps, -1), axis=0)
+            previous = np.where(previous >= 0, previous, last_bin)
+            following = np.minimum.accumulate(np.where(known, steps, num_bins)[::-1], axis=0)[::-1]
+
+            previous_value = np.where(previous >= lo, np.take_along_axis(block, np.maximum(previous - lo, 0), axis=0), last_value)
+            following_value = np.take_along_axis(block, np.minimum(following - lo, hi - lo - 1), axis=0)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                interpolated = np.where(previous >= 0, previous_value + (steps - previous)/(following - previous)*(following_value - previous_value), following_value)
+            # Entries with no next known bin yet are filled later
+            block = np.where(known, block, np.where(following < hi, interpolated, 0.))
+
+            # Gaps of the columns starting in a previous block and ending in this one
+            for column in np.nonzero((following[0] < hi) & (last_bin < lo - 1))[0]:
+                gap = np.arange(last_bin[column] + 1, lo)
+                if last_bin[column] < 0:
+                    readings_columns[gap, column] = following_value[0, column]
+                else:
+                    readings_columns[gap, column] = np.interp(gap, [last_bin[column], following[0, column]],
+                                                              [last_value[column], following_value[0, column]])
+
+            readings_columns[lo:hi] = block
+            last_bin, last_value = previous[-1], previous_value[-1]
+
+        # Hold the last reading of every column until the end (sensors without readings stay at 0)
+        for column in np.nonzero((last_bin >= 0) & (last_bin < num_bins - 1))[0]:
+            readings_columns[last_bin[column] + 1:, column] = last_value[column]
+
+        return readings
+
+    # End of preprocess
+
+
+    """
+    Index in readings of the time step closest to t seconds after the start time (held at the first/last
+    time step outside the recorded range)
+    """
+    def get_time_index(self, t):
+
+        index = int(np.round((self.start_offset + t) / self.dt))
+
+        return min(max(index, 0), self.num_timesteps - 1)
+
+    # End of get_time_index
 
     """
     Spatial interpolation function
-    at_position - 1 x 2 numpy array - position at which interpolation values are to be found.
+    at_position - 1 x 2 numpy array - position at which interpolation values are to be found
+                  (or num_at x 2 for several positions, returning num_at x num_readings).
     base_position - num_pos x 2 numpy array = positions at which the base_readings are known
     base_readings - num_pos x num_readings numpy array - 
                     various readings/measurement corresponding to a single base_position.
@@ -145,25 +364,53 @@ class IntelBerkeley:
 
     def spatial_interpolate(self, at_position, base_position, base_readings):
 
-        distances = np.sum((at_position - base_position) ** 2, axis=-1) ** (1. / 2)
-        inverse_distances = np.minimum(1./(distances+1e-10), 1000)
-        normalized_inverse_distances = inverse_distances / (np.sum(inverse_distances))
+        weights = self.interpolation_matrix(np.reshape(at_position, [-1, 2]), base_position)
+        readings = weights @ np.asarray(base_readings)
 
-        return normalized_inverse_distances @ base_readings
+        return readings[0] if np.ndim(at_position) == 1 else readings
 
     # End of spatial_interpolate
 
-    def get_single_ground_truth(self, t, position):
+    """
+    Inverse distance weights of the base positions at each of the positions
+    positions - num_pos x 2 numpy array
+    base_position - num_base x 2 numpy array
+    num_neighbours - keep only the weights of the num_neighbours nearest base positions (renormalized)
+                     and return a scipy.sparse CSR matrix, None keeps all of them in a dense array
+    return - num_pos x num_base matrix whose rows add up to one
+    """
+    def interpolation_matrix(self, positions, base_position, num_neighbours=None):
+
+        distances = np.sqrt(np.sum((positions[:, np.newaxis, :] - base_position[np.newaxis, :, :]) ** 2, axis=-1))
+        inverse_distances = np.minimum(1./(distances+1e-10), 1000)
+
+        if num_neighbours is None or num_neighbours >= len(base_position):
+            return inverse_distances / np.sum(inverse_distances, axis=1, keepdims=True)
+
+        from scipy import sparse
+
+        nearest = np.argpartition(distances, num_neighbours - 1, axis=1)[:, 0:num_neighbours]
+        weights = np.take_along_axis(inverse_distances, nearest, axis=1)
+        weights /= np.sum(weights, axis=1, keepdims=True)
+        rows = np.repeat(np.arange(len(positions)), num_neighbours)
+
+        return sparse.csr_matrix((weights.reshape(-1), (rows, nearest.reshape(-1))), shape=distances.shape)
+
+    # End of interpolation_matrix
 
-        timestamp = (self.start_time + pd.DateOffset(seconds=t)).round(str(self.dt) + 'S')
+    """
+    Readings of every sensor at time t
+    return - num_sensors x 4 numpy array (Temperature, Humidity, Light, Voltage)
+    """
+    def get_base_readings(self, t):
 
-        base_readings = list()
+        return self.readings[self.get_time_index(t)]
 
-        for sensor_index in range(self.num_sensors):
-            base_readings.append(self.sensorData[sensor_index] \
-                                 .loc[timestamp, 'Temperature':'Voltage'].to_numpy())
+    # End of get_base_readings
+
+    def get_single_ground_truth(self, t, position):
 
-        reading = self.spatial_interpolate(position, self.base_position, base_readings)
+        reading = self.spatial_interpolate(position, self.base_position, self.get_base_readings(t))
 
         return reading
 
@@ -171,19 +418,76 @@ class IntelBerkeley:
 
     def get_full_ground_truth(self, t):
 
-        groundTruth = list()
+        # One product with the precomputed weights for the whole grid
+        readings = self.interpolation_weights @ self.get_base_readings(t)
 
-        for index in range(0, self.num_stacked_positions):
-            print('pos:', index, ' out of ', self.num_stacked_positions)
-            reading = self.get_single_ground_truth(t, self.stacked_positions[index])
-            groundTruth.append(np.append(self.stacked_positions[index], reading))
-
-        snapShot = pd.DataFrame(data=groundTruth, \
+        snapShot = pd.DataFrame(data=np.hstack((self.stacked_positions, readings)), \
                                 columns=['x', 'y', 'Temperature', 'Humidity', 'Light', 'Voltage'])
-    
-        snapShot.to_pickle('~/teste.pkl')
+
         return snapShot
 
+    # End of get_full_ground_truth
+
+    """
+    Full field of a batch of time steps
+    readings - num_steps x num_sensors x 4 numpy array of base readings
+    return - num_steps x num_stacked_positions x 4 numpy array, ordered as stacked_positions
+    """
+    def grid_field(self, readings):
+
+        num_steps = len(readings)
+
+        # (cells x sensors) @ (sensors x steps*channels)
+        field = self.interpolation_weights @ np.asarray(readings).transpose(1, 0, 2).reshape(self.num_sensors, -1)
+
+        return np.asarray(field).reshape(self.num_stacked_positions, num_steps, -1).transpose(1, 0, 2)
+
+    # End of grid_field
+
+    """
+    Full field at every time step between t_start and t_end (seconds after the start time), in one batch
+    return - num_steps x num_stacked_positions x 4 numpy array, ordered as stacked_positions
+    """
+    def get_ground_truth_series(self, t_start, t_end):
+
+        return self.grid_field(self.readings[self.get_time_index(t_start):self.get_time_index(t_end) + 1])
+
+    # End of get_ground_truth_series
+
+    """
+    Write the full field of every time step between t_start and t_end (seconds after the start time, the
+    whole simulation by default) to the directory path, computed and written chunk_steps time steps at a
+    time so memory does not grow with the number of frames. Read it back with GroundTruthSeries(path).
+    - positions.npy: num_stacked_positions x 2 grid positions (x major)
+    - times.npy: num_frames times of the frames (seconds after the start time)
+    - frames.npy: num_frames x 4 x num_stacked_positions readings (each channel of a frame is contiguous)
+    - index.json: dt, start_time, channels, grid_shape and num_frames, written last
+    """
+    def write_ground_truth_series(self, path, t_start=0, t_end=None, chunk_steps=64):
+
+        path = os.path.expanduser(path)
+        first = self.get_time_index(t_start)
+        last = self.get_time_index(self.T_sim if t_end is None else t_end)
+        num_frames = last - first + 1
+
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, 'positions.npy'), self.stacked_positions)
+        np.save(os.path.join(path, 'times.npy'), np.arange(first, last + 1)*self.dt - self.start_offset)
+
+        frames = np.lib.format.open_memmap(os.path.join(path, 'frames.npy'), mode='w+', dtype=np.float64,
+                                           shape=(num_frames, len(self.channels), self.num_stacked_positions))
+        for k in range(0, num_frames, chunk_steps):
+            readings = self.readings[first + k:first + min(k + chunk_steps, num_frames)]
+            frames[k:k + len(readings)] = self.grid_field(readings).transpose(0, 2, 1)
+        frames.flush()
+        del frames
+
+        with open(os.path.join(path, 'index.json'), 'w') as f:
+            json.dump({'dt': self.dt, 'start_time': str(self.start_time), 'channels': self.channels,
+                       'grid_shape': list(self.grid_shape), 'num_frames': num_frames}, f)
+
+    # End of write_ground_truth_series
+
     def plot_full_ground_truth(self, t, sensor_type='Temperature'):
 
         # Get snapshot of data at time t
@@ -205,6 +509,66 @@ class IntelBerkeley:
         return readings + self.noise_cov * np.random.randn(self.num_readings)
 
 
+## GroundTruthSeries class ##
+"""
+Frame series written by IntelBerkeley.write_ground_truth_series, memory-mapped: frames are only read
+from disk when accessed
+"""
+class GroundTruthSeries:
+
+    def __init__(self, path):
+
+        path = os.path.expanduser(path)
+        if not os.path.exists(os.path.join(path, 'index.json')):
+            raise KeyError("[GroundTruthSeries] No frame series in {}".format(path))
+
+        with open(os.path.join(path, 'index.json')) as f:
+            index = json.load(f)
+
+        self.dt = index['dt']
+        self.start_time = pd.Timestamp(index['start_time'])
+        self.channels = index['channels']
+        self.grid_shape = tuple(index['grid_shape'])
+        self.num_frames = index['num_frames']
+
+        self.positions = np.load(os.path.join(path, 'positions.npy'))
+        self.times = np.load(os.path.join(path, 'times.npy'))
+        self.frames = np.load(os.path.join(path, 'frames.npy'), mmap_mode='r')
+
+    # End of __init__() of class GroundTruthSeries
+
+    """
+    Index of the frame closest to t seconds after the start time (held at the first/last frame outside
+    the series)
+    """
+    def get_frame_index(self, t):
+
+        index = int(np.round((t - self.times[0]) / self.dt))
+
+        return min(max(index, 0), self.num_frames - 1)
+
+    # End of get_frame_index
+
+    """
+    Readings of channel at the grid positions in frame index
+    return - num_stacked_positions numpy array (a read only view on the file)
+    """
+    def get_frame(self, index, channel='Temperature'):
+
+        return self.frames[index, self.channels.index(channel)]
+
+    # End of get_frame
+
+    """
+    Frame index as a DataFrame with the columns of IntelBerkeley.get_full_ground_truth
+    """
+    def to_dataframe(self, index):
+
+        return pd.DataFrame(data=np.hstack((self.positions, self.frames[index].T)), columns=['x', 'y'] + self.channels)
+
+    # End of to_dataframe
+
+
 if __name__ == "__main__":
     dataset = IntelBerkeley()
     dataset.plot_full_ground_truth(0, 'Temperature')     
\ No newline at end of file
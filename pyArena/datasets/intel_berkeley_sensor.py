@@ -1,43 +1,54 @@
+import time
+import logging
 import numpy as np
 from scipy import interpolate
 import seaborn as sns
 import matplotlib.pyplot as plt
 
-import rospy
-from sensor_msgs.msg import PointCloud2
-from sensor_msgs.msg import PointField
+# Absolute import: the module is also run as a ROS node script (python intel_berkeley_sensor.py)
+from pyArena.core.transport import ROSTransport
 
-from std_msgs.msg import Float32MultiArray
-import sensor_msgs.point_cloud2 as pc2
-from std_msgs.msg import Float32MultiArray
+logger = logging.getLogger(__name__)
 
+"""
+Samples the temperature of the 'world' point cloud at the position of the vehicle (from the 'state'
+topic) and publishes it on 'sensor_data' every dt, through the transport given by the kwarg transport
+(a ROSTransport by default). While the state or the world has not arrived yet, a warning is logged
+at most once every warn_period seconds.
+"""
 class IntelBerkeleySensor:
     def __init__(self, **kwargs):
         # Parameters
         self.dt = 1
-
-        # ROS node/publisher/subscribers
-        rospy.init_node('anonymous', anonymous=True)
-        self.sensor_pub = rospy.Publisher('sensor_data', Float32MultiArray, queue_size=10)
-        rospy.Subscriber("world", PointCloud2, self.world_callback)        
-        rospy.Subscriber("state", Float32MultiArray, self.state_callback)
+        self.warn_period = kwargs['warn_period'] if 'warn_period' in kwargs else 5.
 
         # Initialize variables
         self.x = np.zeros(2)   # (x,y) position of the robot
-        self.msg_measurement = Float32MultiArray()
+        self.msg_measurement = np.zeros(1)
         
         # Flags
         self.has_world_message = False
         self.has_state_message = False
+        self.last_warning = {'STATE': None, 'WORLD': None}
+
+        # Transport publisher/subscribers
+        self.transport = kwargs['transport'] if 'transport' in kwargs else ROSTransport()
+        if isinstance(self.transport, ROSTransport):
+            from sensor_msgs.msg import PointCloud2
+            self.transport.subscribe('world', self.world_callback, PointCloud2)
+        else:
+            self.transport.subscribe('world', self.world_callback)
+        self.transport.subscribe('state', self.state_callback)
 
-    def world_callback(self, msg):
-        pt_cloud_data = np.frombuffer(msg.data)
+    def world_callback(self, data):
+        pt_cloud_data = np.frombuffer(data, dtype=np.float64)
         self.x_data = np.unique(pt_cloud_data[0::3]) 
         self.y_data = np.unique(pt_cloud_data[1::3])        
         data = pt_cloud_data[2::3].reshape(len(self.x_data), len(self.y_data))
 
         # Create interpolating function [It took about 3 ms for a grid with .25 m cell resolution]
-        self.get_measurement = interpolate.interp2d(self.x_data, self.y_data, data.T, kind='linear')
+        interpolator = interpolate.RegularGridInterpolator((self.x_data, self.y_data), data, method='linear', bounds_error=False, fill_value=None)
+        self.get_measurement = lambda x, y: interpolator([[x, y]])
         self.has_world_message = True
 
         # @TODO This is a standard way to read the point cloud. Perhaps should investigate more.
@@ -46,31 +57,37 @@ class IntelBerkeleySensor:
         #for p in unpacked:
         #    print(" x : %f  y: %f  temp: %f" %(p[0],p[1],p[2]) )
 
-    def state_callback(self,msg):
-        x = np.zeros(2)
-        for i in range(0, 2):
-            x[i] = msg.data[i+1]
-        self.x = x
+    def state_callback(self, data):
+        self.x[:] = data[1:3]
         self.has_state_message = True
 
-    def publish_sensor_data(self, timer):
+    def publish_sensor_data(self, now=None):
         if self.has_state_message and self.has_world_message:
             x = self.x
             measurement = self.get_measurement(x[0],x[1])
-            self.msg_measurement.data = np.array(measurement)
-            self.sensor_pub.publish(self.msg_measurement)
+            self.msg_measurement[:] = np.ravel(measurement)
+            self.transport.publish('sensor_data', self.msg_measurement)
         else:
             if not self.has_state_message:
-                rospy.logwarn("[Sensor] Waiting for STATE message to arrive")
+                self.warn_waiting('STATE')
             if not self.has_world_message:
-                rospy.logwarn("[Sensor] Waiting for WORLD message to arrive")
+                self.warn_waiting('WORLD')
+
+    """
+    Warn that the topic has not arrived yet, at most once every warn_period seconds (wall clock)
+    """
+    def warn_waiting(self, topic):
+        now = time.monotonic()
+        if self.last_warning[topic] is None or now - self.last_warning[topic] >= self.warn_period:
+            self.last_warning[topic] = now
+            logger.warning("[Sensor] Waiting for %s message to arrive", topic)
 
     def run(self):
-        self.timer = rospy.Timer(rospy.Duration(self.dt), self.publish_sensor_data)
+        self.timer = self.transport.timer(self.dt, self.publish_sensor_data)
 
 if __name__ == "__main__":
     sensor = IntelBerkeleySensor()
 
     sensor.run()
 
-    rospy.spin()
\ No newline at end of file
+    sensor.transport.spin()
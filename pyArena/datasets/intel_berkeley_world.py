@@ -1,14 +1,28 @@
 # Summary: Load a a pandas dataFrame and publishes as a pointCloud
 
+import os
+import copy
+import threading
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-import rospy
-from sensor_msgs.msg import PointCloud2
-from sensor_msgs.msg import PointField
+# Absolute imports: the module is also run as a ROS node script (python intel_berkeley_world.py)
+from pyArena.core.transport import ROSTransport
+from pyArena.datasets.intel_berkeley import GroundTruthSeries
 
+"""
+Publishes the temperature frame on the 'world' topic every dt through the transport given by the kwarg
+transport (a ROSTransport by default). ROS receives a PointCloud2, other transports the flattened
+(x, y, Temperature) float64 array of the same point cloud.
+
+When path is a frame series, the frames are played back synchronised to the simulation time of the
+'state' topic: at simulation time t the frame of dataset time t_start + time_scale*t is published.
+The point cloud is double-buffered: x and y are written once in both buffers, and a prefetch thread
+writes the Temperature column of the next frame in the back buffer, so a frame change on the publishing
+path is only a buffer swap.
+"""
 class IntelBerkeleyWorld:
 
     def __init__(self, **kwargs):
@@ -16,13 +30,24 @@ class IntelBerkeleyWorld:
 
         self.dt = 0.5
 
-        # Open file and load as a pandas dataFrame
-        path = kwargs['path'] if 'path' in kwargs else '~/frame_0.pkl'
-        data = pd.read_pickle(path)
+        # Dataset time (seconds after the start time) at simulation time 0, and dataset seconds played
+        # per simulation second
+        self.t_start = kwargs['t_start'] if 't_start' in kwargs else 0.
+        self.time_scale = kwargs['time_scale'] if 'time_scale' in kwargs else 1.
+        self.t = 0.
+
+        # Open file and load as a pandas dataFrame: a pickled frame, or the directory of a frame series
+        # written by IntelBerkeley.write_ground_truth_series (first frame)
+        path = os.path.expanduser(kwargs['path'] if 'path' in kwargs else '~/frame_0.pkl')
+        if os.path.isdir(path):
+            self.series = GroundTruthSeries(path)
+            data = self.series.to_dataframe(0)
+        else:
+            self.series = None
+            data = pd.read_pickle(path)
 
-        # Publisher
-        rospy.init_node('anonymous', anonymous=True)
-        self.pt_cloud_pub = rospy.Publisher('world', PointCloud2, queue_size=10)
+        # Transport publisher
+        self.transport = kwargs['transport'] if 'transport' in kwargs else ROSTransport()
 
         # Size of the world
         self.origin = np.array([min(data.x), min(data.y)]) 
@@ -31,6 +56,46 @@ class IntelBerkeleyWorld:
         self.height = self.end[1] - self.origin[1]
         shift_to_origin = np.array([self.origin[0], self.origin[1], 0.])
 
+        # Front (published) and back point cloud buffers, the arrays are views on the message bytes
+        self.buffers = [bytearray(3*8*len(data)) for _ in range(2)]
+        self.clouds = [np.frombuffer(buffer, dtype=np.float64).reshape(-1, 3) for buffer in self.buffers]
+        for cloud in self.clouds:
+            cloud[:] = data.loc[:,['x','y','Temperature']].to_numpy(dtype=np.float64)-shift_to_origin
+        self.front = 0
+        self.cloud = self.clouds[self.front].reshape(-1)
+
+        if isinstance(self.transport, ROSTransport):
+            self.init_cloud_msg(data)
+        self.origin = np.array([0,0]) 
+
+        # Frame held by each buffer and frame requested from the prefetch thread (None when idle)
+        if self.series is not None:
+            self.frame_index = 0
+            self.back_index = None
+            self.requested = None
+            self.condition = threading.Condition()
+            self.transport.subscribe('state', self.state_callback)
+            with self.condition:
+                self.prefetch(1)
+            threading.Thread(target=self.prefetch_loop, daemon=True).start()
+        
+        fig, (self.ax_map, self.ax_cbar) = plt.subplots(1, 2, gridspec_kw={'width_ratios': [10, 1]})
+        piv = pd.pivot_table(data, values=['Temperature'], index=['y'], columns=['x'])
+        sns.heatmap(piv, cbar_ax=self.ax_cbar, vmin=0, vmax=22,  xticklabels=20, yticklabels=20, cmap='jet', square = True, ax=self.ax_map, cbar = True)
+        self.ax_map.invert_yaxis()
+        self.ax_map.set(xlabel='x [m]', ylabel='y [m]')
+        plt.show(block=False)
+        plt.pause(0.1)
+
+    """
+    Point cloud message for publishing the world on ROS
+    """
+    def init_cloud_msg(self, data):
+        from sensor_msgs.msg import PointCloud2
+        from sensor_msgs.msg import PointField
+
+        self.pt_cloud_pub = self.transport.advertise('world', PointCloud2)
+
         # Assemble single frame message
         self.cloud_msg = PointCloud2()
         self.cloud_msg.width = len(data.x.unique()) 
@@ -60,29 +125,85 @@ class IntelBerkeleyWorld:
                                     data['y'].dtype.itemsize + \
                                     data['Temperature'].dtype.itemsize
         self.cloud_msg.row_step = self.cloud_msg.point_step*self.cloud_msg.width 
-        self.cloud_msg.data = (data.loc[:,['x','y','Temperature']].to_numpy()-shift_to_origin).tostring() 
+        self.cloud_msg.data = self.buffers[self.front]
         self.cloud_msg.is_dense = True
-        self.origin = np.array([0,0]) 
-        
-        fig, (self.ax_map, self.ax_cbar) = plt.subplots(1, 2, gridspec_kw={'width_ratios': [10, 1]})
-        piv = pd.pivot_table(data, values=['Temperature'], index=['y'], columns=['x'])
-        sns.heatmap(piv, cbar_ax=self.ax_cbar, vmin=0, vmax=22,  xticklabels=20, yticklabels=20, cmap='jet', square = True, ax=self.ax_map, cbar = True)
-        self.ax_map.invert_yaxis()
-        self.ax_map.set(xlabel='x [m]', ylabel='y [m]')
-        plt.show(0)
-        plt.pause(0.1)
 
-    def publish(self, timer):
-        self.pt_cloud_pub.publish(self.cloud_msg)
+        # Same message on the back buffer (the data of both is updated in place)
+        back_msg = copy.copy(self.cloud_msg)
+        back_msg.data = self.buffers[1 - self.front]
+        self.cloud_msgs = [self.cloud_msg, back_msg]
+
+    def state_callback(self, data):
+        self.t = data[0]
+
+    """
+    Write the Temperature of frame index in the back buffer
+    """
+    def load_frame(self, index):
+        self.clouds[1 - self.front][:, 2] = self.series.get_frame(index)
+
+    """
+    Ask the prefetch thread to load frame index in the back buffer (called with the condition held)
+    """
+    def prefetch(self, index):
+        self.back_index = None
+        self.requested = index if index < self.series.num_frames else None
+        self.condition.notify_all()
+
+    def prefetch_loop(self):
+        while True:
+            with self.condition:
+                while self.requested is None:
+                    self.condition.wait()
+                index = self.requested
+
+            # The publishing path does not touch the back buffer while a frame is requested
+            self.load_frame(index)
+
+            with self.condition:
+                self.back_index = index
+                self.requested = None
+                self.condition.notify_all()
+
+    """
+    Bring frame index to the front buffer: a swap when it is the prefetched frame (the next one), a
+    synchronous load otherwise (e.g. on a jump of the simulation time)
+    """
+    def show_frame(self, index):
+        if index == self.frame_index:
+            return
+
+        with self.condition:
+            while self.requested is not None:
+                self.condition.wait()
+            if self.back_index != index:
+                self.load_frame(index)
+
+            self.front = 1 - self.front
+            self.frame_index = index
+            self.prefetch(index + 1)
+
+        self.cloud = self.clouds[self.front].reshape(-1)
+        if isinstance(self.transport, ROSTransport):
+            self.cloud_msg = self.cloud_msgs[self.front]
+
+    def publish(self, now=None):
+        if self.series is not None:
+            self.show_frame(self.series.get_frame_index(self.t_start + self.time_scale*self.t))
+
+        if isinstance(self.transport, ROSTransport):
+            self.pt_cloud_pub.publish(self.cloud_msg)
+        else:
+            self.transport.publish('world', self.cloud)
 
     def run(self):
-        self.timer = rospy.Timer(rospy.Duration(self.dt), self.publish)
+        self.timer = self.transport.timer(self.dt, self.publish)
 
 if __name__ == "__main__":
     world = IntelBerkeleyWorld()
 
     world.run()
 
-    rospy.spin()
+    world.transport.spin()
 
     pass
\ No newline at end of file
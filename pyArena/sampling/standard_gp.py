@@ -1,5 +1,6 @@
 from ..core import map
 from ..algorithms.gaussian_process import GPRegression 
+from ..algorithms.local_gp import LocalGPExperts
 import numpy as np
 import seaborn as sns
 import matplotlib.pyplot as plt
@@ -21,8 +22,18 @@ class StandardGP(map.StaticMap):
         self.resolution = kwargs['resolution'] if 'resolution' in kwargs else 1.
         self.grid_size = np.array([self.height/self.resolution, self.width/self.resolution]).astype(int)
 
-        # GP
-        self.m_gp = GPRegression()
+        # GP (e.g. {'method': 'fitc'} selects the sparse inducing point approximation and
+        # {'tileSize': 10.} local experts per tile)
+        kwargsGP = dict(kwargs['GaussianProcess']) if 'GaussianProcess' in kwargs else {}
+        if kwargsGP.get('method', 'exact') != 'exact' and 'inducingPoints' not in kwargsGP:
+            # Default inducing points on a regular grid covering the map
+            step = kwargsGP.pop('inducingResolution', 2.)
+            X, Y = np.meshgrid(np.arange(0, self.width + step, step), np.arange(0, self.height + step, step))
+            kwargsGP['inducingPoints'] = np.stack((X.reshape(-1), Y.reshape(-1)))
+        if 'tileSize' in kwargsGP:
+            self.m_gp = LocalGPExperts(**kwargsGP)
+        else:
+            self.m_gp = GPRegression(**kwargsGP)
 
          # plot
         plt.ion()
@@ -60,7 +71,7 @@ class StandardGP(map.StaticMap):
             self.distance_2_input[flag] = distance[flag]
             pos = np.where(flag)[0]
             print('!!!!! Updating wp #:', pos[0])
-            self.m_gp.trainGP(self.inpTrain[:,pos[0]], measurement)
+            self.m_gp.trainGP(self.inpTrain[:,pos[0]], measurement, t)
             self.m_gp.update_grid(self.height, self.width, self.resolution)
     def get_map(self):
        
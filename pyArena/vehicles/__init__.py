@@ -1 +1 @@
-__all__ = ["unicycle"]
+__all__ = ["unicycle", "unicycle_fleet"]
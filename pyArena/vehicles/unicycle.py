@@ -1,4 +1,5 @@
 from ..core import system
+import math
 import numpy as np
 
 class Unicycle(system.DynamicSystem):
@@ -11,8 +12,34 @@ class Unicycle(system.DynamicSystem):
 
         super().__init__(**kwargs)
 
-    # Unicycle kinematic model
+    # Unicycle kinematic model (x and u may also be (N, 3) and (N, 2) arrays of vehicles)
     def stateEquation(self, t, x, u):
-        return np.array([u[0]*np.cos(x[2]), 
-                         u[0]*np.sin(x[2]), 
-                         u[1]])    
+        return np.stack([u[...,0]*np.cos(x[...,2]), 
+                         u[...,0]*np.sin(x[...,2]), 
+                         u[...,1]], axis=-1)
+
+    # Closed-form solution for constant linear and angular speeds
+    def exactStep(self, t, x, u, dt):
+        # Single vehicle: scalar math, numpy calls on a 3-vector cost as much as rk4
+        if x.ndim == 1:
+            dx, dy, heading = _arcStep(u[0], u[1], x[2], dt, math.sin, math.cos, _select)
+            return np.array([x[0] + dx, x[1] + dy, heading])
+
+        dx, dy, heading = _arcStep(u[...,0], u[...,1], x[...,2], dt, np.sin, np.cos, np.where)
+        return np.stack([x[...,0] + dx, x[...,1] + dy, heading], axis=-1)
+
+"""
+Displacement and heading after dt at linear speed v and angular speed w from heading theta, for scalars
+(math functions) or arrays of vehicles (numpy functions)
+"""
+def _arcStep(v, w, theta, dt, sin, cos, where):
+    heading = theta + w*dt
+    # Straight motion for (nearly) zero angular speed, arc of radius v/w otherwise
+    straight = abs(w) < 1e-9
+    w_safe = where(straight, 1., w)
+    dx = where(straight, v*dt*cos(theta), v/w_safe*(sin(heading) - sin(theta)))
+    dy = where(straight, v*dt*sin(theta), -v/w_safe*(cos(heading) - cos(theta)))
+    return dx, dy, heading
+
+def _select(condition, a, b):
+    return a if condition else b
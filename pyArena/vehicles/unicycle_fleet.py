@@ -0,0 +1,25 @@
+from .unicycle import Unicycle
+import numpy as np
+
+"""
+Fleet of N unicycles simulated as a single batch system. The states are held in a (N, 3) array and
+the inputs in a (N, 2) array, so the dynamics of the whole fleet (and the batch control laws of
+TrajectoryTracking2D and LOSUnicycle) are evaluated with one NumPy call per step.
+Messages and logs carry the flattened arrays (x_dimension = 3N, u_dimension = 2N). A controller fed
+through a transport must be built with numVehicles=N to receive the whole fleet.
+"""
+class UnicycleFleet(Unicycle):
+
+    def __init__(self, **kwargs):
+        if 'initialCondition' not in kwargs:
+            raise KeyError("Must specify the (N, 3) initialCondition of the fleet")
+
+        kwargs['initialCondition'] = np.array(kwargs['initialCondition'], dtype=float).reshape([-1,3])
+
+        super().__init__(**kwargs)
+
+        self.numVehicles = self.x.shape[0]
+        self.x_dimension = 3*self.numVehicles
+        self.u_dimension = 2*self.numVehicles
+        self.u = np.zeros([self.numVehicles, 2])
+        self.msg_state = np.zeros(self.x_dimension+1)